@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Kept so `python3 diff_editions.py ...` and `import diff_editions` keep working; see handbook.diff."""
+
+from handbook.diff import *  # noqa: F401,F403
+from handbook.diff import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Kept so `python3 export_chunks.py ...` and `import export_chunks` keep working; see handbook.chunks."""
+
+from handbook.chunks import *  # noqa: F401,F403
+from handbook.chunks import main
+
+if __name__ == "__main__":
+    main()
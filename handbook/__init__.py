@@ -0,0 +1,51 @@
+"""
+Handbook toolchain: PDF heading extraction, the HTML viewer and the
+query-side tools built on headings.json.
+
+Submodules are imported on first use, so `import handbook` (or pulling a
+single helper such as `handbook.build_tree`) does not load pdfplumber or
+NumPy. Only the stages that read PDFs or build search indexes pay for them.
+
+    detect     heading detection and section bodies (pdfplumber)
+    index      HandbookIndex lookups over headings.json
+    viewer     headings.html / service worker / corpus builder
+    search     character n-gram TF-IDF search index (NumPy)
+    diff       edition diff
+    chunks     token-bounded JSONL chunk export
+    telemetry  viewer timing collector
+    cli        `python -m handbook <command>`
+"""
+
+import importlib
+
+_EXPORTS = {
+    "extract_headings": "detect",
+    "attach_section_html": "detect",
+    "build_tree": "detect",
+    "format_lines_as_html": "detect",
+    "HeaderFooterFilter": "detect",
+    "ImageStore": "detect",
+    "WordLayer": "detect",
+    "HandbookIndex": "index",
+    "section_plain_text": "index",
+    "write_html": "viewer",
+    "build_corpus_manifest": "viewer",
+    "SearchIndex": "search",
+    "diff_editions": "diff",
+    "iter_chunks": "chunks",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
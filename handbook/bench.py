@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Timing checks for the toolchain.
+
+- `handbook bench --imports` is the import-time regression check. It
+  imports the lightweight modules in a fresh interpreter under
+  `-X importtime`. It fails if any of them pulled in a heavy dependency
+  (pdfplumber, pdfminer, Pillow, pypdfium2, cryptography, NumPy), or if
+  their cumulative import time exceeds the budget.
+- `handbook bench PDF` times each extraction stage on one open PDF. The
+  first stage also pays for parsing the pages, which every later stage
+  reuses.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+# Must import without any heavy dependency (detect imports pdfplumber lazily)
+LIGHT_MODULES = (
+    "handbook",
+    "handbook.cli",
+    "handbook.detect",
+    "handbook.index",
+    "handbook.viewer",
+    "handbook.chunks",
+    "handbook.diff",
+    "handbook.telemetry",
+)
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "PIL", "pypdfium2", "cryptography", "numpy")
+IMPORT_BUDGET_MS = 150.0
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def measure_imports(modules=LIGHT_MODULES) -> Tuple[float, List[str], Dict[str, float]]:
+    """
+    Import `modules` in a fresh interpreter with -X importtime.
+
+    Returns (total ms, heavy top-level packages that got imported,
+    cumulative ms per requested module).
+    """
+    code = "; ".join(f"import {name}" for name in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    heavy = set()
+    per_module: Dict[str, float] = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        cumulative_us, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if name.split(".")[0] in HEAVY_MODULES:
+            heavy.add(name.split(".")[0])
+        if depth == 1:  # imported directly by the -c line
+            total_us += cumulative_us
+        if name in modules:
+            per_module[name] = cumulative_us / 1000.0
+    return total_us / 1000.0, sorted(heavy), per_module
+
+
+def check_imports(budget_ms=IMPORT_BUDGET_MS):
+    total_ms, heavy, per_module = measure_imports()
+    for name in LIGHT_MODULES:
+        print(f"  {name:20s} {per_module.get(name, 0.0):8.1f} ms")
+    print(f"  {'total':20s} {total_ms:8.1f} ms (budget {budget_ms:.0f} ms)")
+
+    ok = True
+    if heavy:
+        print("❌ Heavy dependencies imported at module load:", ", ".join(heavy))
+        ok = False
+    if total_ms > budget_ms:
+        print(f"❌ Import time {total_ms:.1f} ms is over the {budget_ms:.0f} ms budget")
+        ok = False
+    if ok:
+        print("✅ Lightweight modules import without PDF or NumPy dependencies")
+    return ok
+
+
+def bench_pdf(pdf_path, max_pages=None):
+    """Time every extraction stage once on a single open PDF."""
+    from .detect import (
+        HeaderFooterFilter,
+        attach_section_html,
+        extract_headings,
+        open_pdf,
+        page_dimensions,
+    )
+
+    timings = []
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((label, time.perf_counter() - start))
+        return result
+
+    timed("import pdfplumber", lambda: __import__("pdfplumber"))
+    with open_pdf(pdf_path) as pdf:
+        header_footer = timed(
+            "header/footer scan", lambda: HeaderFooterFilter(pdf, max_pages=max_pages)
+        )
+        _, _, headings, _ = timed(
+            "headings",
+            lambda: extract_headings(pdf, max_pages=max_pages, header_footer=header_footer),
+        )
+        timed(
+            "section bodies",
+            lambda: attach_section_html(pdf, headings, header_footer=header_footer),
+        )
+        timed("page sizes", lambda: page_dimensions(pdf))
+
+    for label, seconds in timings:
+        print(f"  {label:20s} {seconds * 1000:9.1f} ms")
+    print(f"  {'total':20s} {sum(s for _, s in timings) * 1000:9.1f} ms ({len(headings)} headings)")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Time the extraction stages and check module import cost.",
+    )
+    parser.add_argument("pdf", nargs="?", default=None, help="PDF to time the extraction stages on")
+    parser.add_argument("--max-pages", type=int, default=None, help="Only use the first N pages")
+    parser.add_argument(
+        "--imports",
+        action="store_true",
+        help="Check that lightweight modules import fast and without heavy dependencies",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=IMPORT_BUDGET_MS,
+        help=f"Import time budget for --imports (default: {IMPORT_BUDGET_MS:.0f})",
+    )
+
+    args = parser.parse_args(argv)
+    if not args.pdf and not args.imports:
+        parser.error("pass a PDF to time, --imports, or both")
+
+    ok = True
+    if args.imports:
+        print("Import time:")
+        ok = check_imports(args.budget_ms)
+    if args.pdf:
+        print(f"Extraction stages for {args.pdf}:")
+        bench_pdf(args.pdf, max_pages=args.max_pages)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Export headings.json sections as token-bounded chunks (JSONL) for retrieval
+ingestion.
+
+Sections are walked in reading order through `HandbookIndex`, so bodies are
+decoded from the memory map one at a time and written out as soon as they
+are chunked; a whole corpus streams through in constant memory.
+
+- A parent heading's `content_html` also covers its subsections, so only
+  its own text (up to the first child heading) is chunked; the children
+  produce their own chunks.
+- Text is split at block boundaries (paragraphs, list items, table rows)
+  and blocks are packed into chunks of at most `--max-tokens`. A block
+  longer than the budget is split between words, and a single run with
+  no whitespace (a URL, a long formula) longer than the budget is cut at
+  token boundaries, so no chunk ever exceeds the budget.
+- `--overlap N` repeats up to N tokens of trailing blocks at the start of
+  the next chunk of the same section.
+- Tokens are approximated as runs of word characters or of punctuation,
+  which tracks subword tokenizer counts closely enough for budgeting
+  without pulling in a tokenizer.
+
+Each line is one chunk:
+
+    {"id": "...", "doc": "...", "heading_id": 12, "path": ["3. ...", "3.1 ..."],
+     "page_start": 11, "top_start": 96.2, "page_end": 12, "top_end": 70.5,
+     "tokens": 231, "text": "..."}
+
+The page/top range is that of the whole section the chunk came from,
+ending where the next heading starts (`top_end` is null at the end of the
+PDF): section bodies carry no per-line positions, so every chunk of a
+section spanning several pages reports all of them.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple
+
+from .index import HandbookIndex
+
+TOKEN_RE = re.compile(r"[^\W_]+|[^\w\s]+|_+")
+DEFAULT_MAX_TOKENS = 256
+EMPTY_SECTION_TEXT = "No text detected for this section."
+
+
+def count_tokens(text):
+    return len(TOKEN_RE.findall(text))
+
+
+def split_word(word, max_tokens) -> Iterator[Tuple[str, int]]:
+    """Yield (piece, tokens) for a whitespace-free run, cut at token starts."""
+    starts = [match.start() for match in TOKEN_RE.finditer(word)]
+    for i in range(0, len(starts), max_tokens):
+        end = starts[i + max_tokens] if i + max_tokens < len(starts) else len(word)
+        piece = word[starts[i] if i else 0 : end]
+        yield piece, count_tokens(piece)
+
+
+def split_block(text, max_tokens) -> Iterator[Tuple[str, int]]:
+    """
+    Yield (piece, tokens) for a block, cutting between words if too long,
+    and inside a word if that word alone is over the budget.
+    """
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        yield text, tokens
+        return
+
+    words: List[str] = []
+    total = 0
+    for word in text.split():
+        word_tokens = count_tokens(word)
+        if words and total + word_tokens > max_tokens:
+            yield " ".join(words), total
+            words, total = [], 0
+        if word_tokens > max_tokens:
+            yield from split_word(word, max_tokens)
+            continue
+        words.append(word)
+        total += word_tokens
+    if words:
+        yield " ".join(words), total
+
+
+def chunk_blocks(blocks, max_tokens, overlap=0) -> Iterator[Tuple[List[str], int]]:
+    """
+    Pack text blocks into chunks of at most `max_tokens`, repeating up to
+    `overlap` tokens of whole trailing blocks in the following chunk.
+    Yields (blocks, tokens) per chunk.
+    """
+    window = deque()  # (text, tokens)
+    total = 0
+    fresh = False  # window holds something not yet emitted
+    for block in blocks:
+        for piece, tokens in split_block(block, max_tokens):
+            if fresh and total + tokens > max_tokens:
+                yield [text for text, _ in window], total
+                fresh = False
+                while window and (total > overlap or total + tokens > max_tokens):
+                    total -= window.popleft()[1]
+            window.append((piece, tokens))
+            total += tokens
+            fresh = True
+    if fresh:
+        yield [text for text, _ in window], total
+
+
+def own_blocks(index, node):
+    """
+    Text blocks of a section, without the part that belongs to its
+    children (see `HandbookIndex.own_section_html`).
+    """
+    lines = index.own_section_text(node["id"], cache=False).split("\n")
+    return [line for line in lines if line and line != EMPTY_SECTION_TEXT]
+
+
+def iter_chunks(index, max_tokens=DEFAULT_MAX_TOKENS, overlap=0, doc=None) -> Iterator[Dict[str, Any]]:
+    """Yield chunk records for every section of one HandbookIndex, in reading order."""
+    doc = doc or index.meta.get("pdf") or index.json_path.stem
+    page_count = len(index.meta.get("page_sizes") or [])
+
+    nodes = iter(index)
+    node = next(nodes, None)
+    while node is not None:
+        following = next(nodes, None)
+        if following is not None:
+            page_end, top_end = following["page"], following["top"]
+        else:
+            page_end, top_end = max(page_count, node["page"]), None
+
+        path = [a["text"] for a in index.ancestors(node["id"])] + [node["text"]]
+        for n, (blocks, tokens) in enumerate(
+            chunk_blocks(own_blocks(index, node), max_tokens, overlap)
+        ):
+            yield {
+                "id": f"{doc}#{node['id']}-{n}",
+                "doc": doc,
+                "heading_id": node["id"],
+                "path": path,
+                "page_start": node["page"],
+                "top_start": node["top"],
+                "page_end": page_end,
+                "top_end": top_end,
+                "tokens": tokens,
+                "text": "\n".join(blocks),
+            }
+        node = following
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Export headings.json sections as token-bounded JSONL chunks.",
+        epilog=(
+            "page_start/top_start and page_end/top_end give the range of the "
+            "chunk's whole section, not of the chunk itself: section bodies "
+            "carry no per-line page positions."
+        ),
+    )
+    parser.add_argument("json", nargs="+", help="One or more headings.json files")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Write chunks to this .jsonl file (default: stdout)",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=DEFAULT_MAX_TOKENS,
+        help=(
+            f"Token budget per chunk (default: {DEFAULT_MAX_TOKENS}); over-long "
+            "words are cut at token boundaries to stay within it"
+        ),
+    )
+    parser.add_argument(
+        "--overlap",
+        type=int,
+        default=0,
+        help="Tokens of trailing blocks repeated in the next chunk (default: 0)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.max_tokens < 1:
+        parser.error("--max-tokens must be positive")
+    if not 0 <= args.overlap < args.max_tokens:
+        parser.error("--overlap must be between 0 and --max-tokens - 1")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    written = 0
+    try:
+        for json_path in args.json:
+            with HandbookIndex(json_path) as index:
+                for chunk in iter_chunks(index, args.max_tokens, args.overlap):
+                    out.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+                    written += 1
+    finally:
+        if args.output:
+            out.close()
+
+    if args.output:
+        print(f"✅ Wrote {written} chunks from {len(args.json)} file(s) to {Path(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the toolchain: `python -m handbook <command> ...`.
+
+Only this module and argparse load at startup. The module behind a command
+is imported when that command runs, so `--help`, `tree` or `serve` never
+import pdfplumber or NumPy. Each command takes the same arguments as the
+matching top-level script (`extract` = detect_headings.py, `html` =
+build_headings_html.py, ...).
+"""
+
+import argparse
+import importlib
+import json
+import sys
+from pathlib import Path
+
+# command -> (module with main(argv, prog), one-line help)
+COMMANDS = {
+    "extract": ("detect", "Detect headings in a PDF and attach section bodies"),
+    "tree": ("cli", "Print the heading tree of a headings.json (no PDF needed)"),
+    "html": ("viewer", "Build headings.html + its service worker (or a --corpus library)"),
+    "serve": ("cli", "Serve the viewer folder over HTTP"),
+    "bench": ("bench", "Time the extraction stages and check import cost"),
+    "index": ("index", "Look up sections in a headings.json"),
+    "search": ("search", "Build or query the fuzzy search index"),
+    "diff": ("diff", "Diff two editions into a re-indexing delta"),
+    "chunks": ("chunks", "Export token-bounded JSONL chunks"),
+    "telemetry": ("telemetry", "Collect and report viewer timings"),
+}
+
+
+def tree_main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Print the heading tree stored in a headings.json file.",
+    )
+    parser.add_argument("json", help="Path to headings.json")
+
+    args = parser.parse_args(argv)
+
+    from .detect import print_tree
+
+    data = json.loads(Path(args.json).read_text(encoding="utf-8"))
+    print_tree(data if isinstance(data, list) else data.get("headings", []))
+
+
+def serve_main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Serve the viewer (headings.html, the PDF and vendor/) over HTTP.",
+    )
+    parser.add_argument("directory", nargs="?", default=".", help="Folder to serve (default: .)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+
+    args = parser.parse_args(argv)
+
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    handler = partial(SimpleHTTPRequestHandler, directory=args.directory)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"✅ Serving {Path(args.directory).resolve()} on http://{args.host}:{args.port}/headings.html")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+LOCAL_COMMANDS = {"tree": tree_main, "serve": serve_main}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    width = max(len(name) for name in COMMANDS)
+    parser = argparse.ArgumentParser(
+        prog="handbook",
+        description="Handbook PDF toolchain.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(
+            f"  {name:{width}s}  {help_text}" for name, (_, help_text) in COMMANDS.items()
+        ) + "\n\nRun `handbook <command> --help` for a command's options.",
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+    prog = f"handbook {args.command}"
+
+    if args.command in LOCAL_COMMANDS:
+        return LOCAL_COMMANDS[args.command](args.args, prog=prog)
+
+    module_name, _ = COMMANDS[args.command]
+    module = importlib.import_module(f".{module_name}", __package__)
+    return module.main(args.args, prog=prog)
+
+
+if __name__ == "__main__":
+    main()
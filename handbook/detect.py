@@ -0,0 +1,1128 @@
+#!/usr/bin/env python3
+"""
+Simple heading/subheading detector for PDFs.
+
+Heuristics:
+- Uses pdfplumber to read words, their font sizes and positions.
+- Finds the most common font size = "body" text.
+- Any larger fonts that occur often enough are treated as heading sizes.
+- Uses font size + simple regex patterns to distinguish:
+    - Document titles (largest font, e.g. cover page)
+    - Top-level sections: "1. INTRODUCTION"
+    - Subsections:      "3.1 Paracetamol", etc.
+
+Extraction runs in two tiers. The font-size histogram is counted straight
+from the characters, and the heading pass drops every character smaller
+than the smallest heading size before words and lines are built,
+so it only clusters the few large-font characters on each page. Full line
+assembly happens once per page, in the section-body pass, and is shared by
+every section that overlaps the page. All stages accept an already-open
+pdfplumber PDF, so `main` parses each page only once.
+
+Running headers, footers and page numbers are found up front by hashing
+each margin line (digits folded, position banded) across all pages; lines
+that recur on enough pages are left out of section bodies and are never
+taken as headings.
+
+With `--images DIR`, embedded images are also pulled into section bodies.
+Each is stored once under DIR, named by a hash of its encoded stream, so
+logos and icons repeated across pages (or documents sharing DIR) are
+decoded and written a single time. `--words DIR` writes every page's word
+boxes as small per-page shards for the viewer's find-in-document.
+
+You can later reuse the `extract_headings` / `build_tree` functions
+inside your Teams app backend. For lookups over the generated JSON
+(by id, parent path, or page position) use `handbook_index.HandbookIndex`.
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import re
+import statistics
+from bisect import bisect_right
+from collections import Counter
+from contextlib import contextmanager
+from html import escape
+from io import BytesIO
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional
+
+
+@contextmanager
+def open_pdf(pdf_path):
+    """
+    Yield an open pdfplumber PDF for a path (closed on exit), or pass an
+    already-open PDF straight through so stages can share parsed pages.
+    """
+    # pdfplumber pulls in pdfminer, Pillow and pypdfium2; only stages that
+    # actually read a PDF pay for that import.
+    import pdfplumber
+
+    if isinstance(pdf_path, pdfplumber.PDF):
+        yield pdf_path
+        return
+    with pdfplumber.open(pdf_path) as pdf:
+        yield pdf
+
+
+def page_words(page):
+    """
+    Words of a page (or filtered page) with their font name and size. Every
+    stage splits words this way, so word boundaries agree between heading
+    detection, header/footer signatures, section bodies and the word layer.
+    """
+    return page.extract_words(extra_attrs=["fontname", "size"])
+
+
+WORD_BREAK_GAP = 3  # pdf units; matches pdfplumber's default x/y tolerance
+
+
+def count_word_sizes(chars, size_counts):
+    """
+    Add one count per word to `size_counts`, keyed by font size, straight
+    from the characters in content-stream order. A word starts after
+    whitespace, at a font or size change, on a new line, or after a
+    horizontal jump. That is close enough to `page_words` for a histogram,
+    without its line clustering and sorting.
+    """
+    prev_size = prev_font = None
+    prev_top = prev_x1 = 0.0
+    for ch in chars:
+        if ch["text"].isspace():
+            prev_size = None
+            continue
+        size, font, top, x0 = ch["size"], ch["fontname"], ch["top"], ch["x0"]
+        if (size != prev_size or font != prev_font
+                or abs(top - prev_top) > WORD_BREAK_GAP
+                or not -0.5 <= x0 - prev_x1 <= WORD_BREAK_GAP):
+            size_counts[round(float(size), 1)] += 1
+        prev_size, prev_font, prev_top, prev_x1 = size, font, top, ch["x1"]
+
+
+def analyze_font_sizes(pdf_path, sample_pages=None):
+    """
+    Scan the PDF and infer:
+    - body_size: most common font size
+    - heading_sizes: list of font sizes significantly larger than body
+
+    Sizes are counted per word from `page.chars` (`count_word_sizes`), so
+    this pass does no word clustering and costs a small fraction of a
+    full text extraction.
+    """
+    size_counts = Counter()
+
+    with open_pdf(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+        if sample_pages is None:
+            pages_range = range(n_pages)
+        else:
+            pages_range = range(min(sample_pages, n_pages))
+
+        for i in pages_range:
+            count_word_sizes(pdf.pages[i].chars, size_counts)
+
+    if not size_counts:
+        raise RuntimeError("No font sizes found in the PDF.")
+
+    # Most frequent font size = body text
+    body_size, _ = max(size_counts.items(), key=lambda kv: kv[1])
+
+    # Heading sizes: larger than body and used more than a few times
+    heading_sizes = sorted(
+        [
+            size
+            for size, count in size_counts.items()
+            if size > body_size + 0.5 and count >= 3
+        ],
+        reverse=True,  # largest font first
+    )
+
+    return body_size, heading_sizes, size_counts
+
+
+def classify_line_level(text,
+                        median_size,
+                        body_size,
+                        heading_sizes,
+                        size_tol=0.6):
+    """
+    Decide if a line is a heading and what level it should be.
+
+    Returns:
+        1, 2, 3, ... for heading levels
+        None if this line is not a heading
+    """
+    # Map font size to "tier" (1 = largest heading size)
+    tier = None
+    for idx, h_size in enumerate(heading_sizes, start=1):
+        if abs(median_size - h_size) <= size_tol:
+            tier = idx
+            break
+
+    if tier is None:
+        return None
+
+    text_stripped = text.strip()
+
+    # Regexes tuned for this style of manual:
+    # e.g. "1. INTRODUCTION" (all caps after the number)
+    upper_section = re.compile(r"^\d+\.\s+[A-Z0-9 ,()/\-]+$")
+    # e.g. "3.1 Paracetamol"
+    subsection = re.compile(r"^\d+\.\d+")
+
+    if tier == 1:
+        # Biggest font (e.g. title lines)
+        return 1
+
+    if upper_section.match(text_stripped):
+        # "1. INTRODUCTION", "2. PRINCIPLES OF ..."
+        return 2
+    elif subsection.match(text_stripped):
+        # "3.1 Paracetamol", "3.2 Diclofenac (Voltaren)", etc.
+        return 3
+    else:
+        # Fallback: still treat as some kind of heading
+        return 2 + (tier - 2)
+
+
+HEADER_FOOTER_MARGIN = 0.1  # top/bottom fraction of a page searched for running lines
+HEADER_FOOTER_BAND = 6.0  # pdf units; lines this close in position share a signature
+HEADER_FOOTER_MIN_PAGES = 3
+HEADER_FOOTER_MIN_SHARE = 0.4  # of scanned pages; alternating odd/even headers hit ~0.5
+DIGITS_RE = re.compile(r"\d+")
+SIGNATURE_TEXT_RE = re.compile(r"[^\W_]|#")
+
+
+def line_signature(text, top, page_height):
+    """
+    Hash of a margin line's normalised text plus its position band, or None
+    for lines outside the margins (or with nothing but punctuation/bullets).
+
+    Digits are folded to "#" so "Page 3 of 57" and "Page 4 of 57" match,
+    and footers are banded from the bottom edge so they still match on
+    pages of a different height.
+    """
+    if top < page_height * HEADER_FOOTER_MARGIN:
+        zone, offset = "header", top
+    elif top > page_height * (1 - HEADER_FOOTER_MARGIN):
+        zone, offset = "footer", page_height - top
+    else:
+        return None
+    normalized = DIGITS_RE.sub("#", " ".join(text.split()).casefold())
+    if not SIGNATURE_TEXT_RE.search(normalized):
+        return None
+    band = round(offset / HEADER_FOOTER_BAND)
+    return hashlib.sha1(f"{zone}|{band}|{normalized}".encode("utf-8")).hexdigest()[:16]
+
+
+class HeaderFooterFilter:
+    """
+    Running headers, footers and page numbers, found in one pass over the
+    margins of every page: each margin line is reduced to a
+    `line_signature`, and signatures seen on enough distinct pages are
+    recurring. Stages pass their lines through `is_header_footer` to drop
+    them from section bodies and heading candidates.
+    """
+
+    def __init__(self, pdf_path, max_pages=None):
+        page_counts = Counter()
+        with open_pdf(pdf_path) as pdf:
+            n_pages = len(pdf.pages)
+            if max_pages is not None:
+                n_pages = min(max_pages, n_pages)
+            for page in pdf.pages[:n_pages]:
+                page_counts.update(self._margin_signatures(page))
+
+        threshold = max(HEADER_FOOTER_MIN_PAGES, HEADER_FOOTER_MIN_SHARE * n_pages)
+        self.signatures = {sig for sig, count in page_counts.items() if count >= threshold}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def _margin_signatures(page):
+        height = float(page.height)
+        low, high = height * HEADER_FOOTER_MARGIN, height * (1 - HEADER_FOOTER_MARGIN)
+
+        def in_margin(obj):
+            if obj.get("object_type") != "char":
+                return False
+            return not low <= float(obj["top"]) <= high
+
+        lines = {}
+        for w in page_words(page.filter(in_margin)):
+            lines.setdefault(round(float(w["top"]), 1), []).append(w)
+
+        found = set()
+        for top, line_words in lines.items():
+            text = " ".join(w["text"] for w in sorted(line_words, key=lambda w: w["x0"]))
+            sig = line_signature(text, top, height)
+            if sig:
+                found.add(sig)
+        return found
+
+    def is_header_footer(self, text, top, page_height):
+        if not self.signatures:
+            return False
+        return line_signature(text, top, page_height) in self.signatures
+
+
+def heading_chars_page(page, min_size):
+    """
+    Return a view of `page` holding only characters of at least `min_size`
+    (plus all non-character objects), so word/line clustering for heading
+    detection skips body text entirely.
+    """
+    def keep(obj):
+        if obj.get("object_type") != "char":
+            return True
+        try:
+            return float(obj.get("size")) >= min_size
+        except (TypeError, ValueError):
+            return False
+
+    return page.filter(keep)
+
+
+def extract_headings(pdf_path,
+                     size_tol=0.6,
+                     max_pages=None,
+                     heading_chars_only=True,
+                     header_footer=None):
+    """
+    Extract heading lines from the PDF.
+
+    With `heading_chars_only` (the default), characters smaller than every
+    heading tier are filtered out before any word/line clustering. They can
+    never pass `classify_line_level`, so only lines mixing heading-size and
+    body-size words can come out differently (without their body words).
+    Lines matched by a `HeaderFooterFilter` are never headings.
+
+    Returns:
+        body_size, heading_sizes, headings_list, size_counts
+    """
+    body_size, heading_sizes, size_counts = analyze_font_sizes(
+        pdf_path, sample_pages=max_pages
+    )
+
+    headings = []
+    if heading_chars_only and not heading_sizes:
+        return body_size, heading_sizes, headings, size_counts
+    min_heading_size = min(heading_sizes) - size_tol if heading_sizes else None
+
+    with open_pdf(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+        if max_pages is None:
+            page_range = range(n_pages)
+        else:
+            page_range = range(min(max_pages, n_pages))
+
+        for p_idx in page_range:
+            page = pdf.pages[p_idx]
+            page_height = float(page.height)
+            if heading_chars_only:
+                page = heading_chars_page(page, min_heading_size)
+            words = page_words(page)
+
+            # Group words into lines by vertical position ('top')
+            lines = {}
+            for w in words:
+                top = float(w["top"])
+                key = round(top, 1)
+                lines.setdefault(key, []).append(w)
+
+            # Iterate lines from top to bottom
+            for top, line_words in sorted(lines.items(), key=lambda kv: kv[0]):
+                # Sort words left to right
+                line_words_sorted = sorted(line_words, key=lambda w: w["x0"])
+                text = " ".join(w["text"] for w in line_words_sorted).strip()
+                if not text:
+                    continue
+                if header_footer and header_footer.is_header_footer(text, top, page_height):
+                    continue
+
+                sizes = [float(w["size"]) for w in line_words_sorted]
+                median_size = statistics.median(sizes)
+
+                level = classify_line_level(
+                    text, median_size, body_size, heading_sizes, size_tol=size_tol
+                )
+                if level is None:
+                    continue
+
+                # Heuristic: skip extremely long lines (probably body)
+                if len(text) > 160:
+                    continue
+
+                heading_id = len(headings)
+                headings.append(
+                    {
+                        "id": heading_id,
+                        "page": p_idx + 1,  # human-friendly page number
+                        "top": top,
+                        "level": level,
+                        "font_size": median_size,
+                        "text": text,
+                    }
+                )
+
+    # Ensure reading order: by page, then vertical position
+    headings.sort(key=lambda h: (h["page"], h["top"]))
+    return body_size, heading_sizes, headings, size_counts
+
+
+BULLET_CHARS = ("•", "-", "–", "—", "▪", "‣", "·")
+GAP_THRESHOLD = 14  # pdf coordinate units (~points)
+COLUMN_TOLERANCE = 6  # run starts this close are the same table column
+
+
+def assemble_line(words):
+    """Build a text string for a line + classify its type."""
+    if not words:
+        return "", "blank"
+
+    segments = [words[0]["text"]]
+    large_gaps = 0
+
+    for prev, curr in zip(words, words[1:]):
+        gap = float(curr["x0"]) - float(prev["x1"])
+        if gap > GAP_THRESHOLD:
+            segments.append("    ")  # emulate column spacing
+            large_gaps += 1
+        else:
+            segments.append(" ")
+        segments.append(curr["text"])
+
+    raw = "".join(segments)
+    stripped = raw.strip()
+    if not stripped:
+        return "", "blank"
+
+    if stripped[:1] in BULLET_CHARS:
+        return stripped, "bullet"
+
+    if large_gaps >= 2:
+        return raw, "table"
+
+    return stripped, "paragraph"
+
+
+def split_cells(words):
+    """Split a left-to-right line into (x0, x1, text) runs at large gaps."""
+    segments = []
+    for w in words:
+        x0, x1 = float(w["x0"]), float(w["x1"])
+        if segments and x0 - segments[-1][1] <= GAP_THRESHOLD:
+            seg_x0, _, text = segments[-1]
+            segments[-1] = (seg_x0, x1, text + " " + w["text"])
+        else:
+            segments.append((x0, x1, w["text"]))
+    return segments
+
+
+def column_starts(rows):
+    """
+    Left edges of the table columns implied by rows of words.
+
+    Rows are cut into cell runs at the same gaps as `split_cells`, keeping
+    each word's start. Every run start is a candidate, clustered within
+    COLUMN_TOLERANCE. A candidate that more runs cross than start at is
+    not a column edge (it is text inside another column, e.g. a footnote
+    indented into it). Runs that cross a remaining edge without a word
+    starting there span columns (captions, merged cells) and only keep a
+    candidate alive if another run starts there as well; a run with a word
+    on the edge is two cells joined by a narrow gap and still counts.
+    """
+    runs = []  # [x0, x1, word starts]
+    for words in rows:
+        run = None
+        for w in words:
+            x0, x1 = float(w["x0"]), float(w["x1"])
+            if run and x0 - run[1] <= GAP_THRESHOLD:
+                run[1] = x1
+                run[2].append(x0)
+            else:
+                run = [x0, x1, [x0]]
+                runs.append(run)
+    if not runs:
+        return []
+
+    def crosses(run, x):
+        return run[0] + COLUMN_TOLERANCE < x < run[1]
+
+    def spans(run, x):
+        return crosses(run, x) and all(abs(s - x) > COLUMN_TOLERANCE for s in run[2])
+
+    clusters = []  # [start, runs starting there]
+    for run in sorted(runs):
+        if clusters and run[0] - clusters[-1][1][-1][0] <= COLUMN_TOLERANCE:
+            clusters[-1][1].append(run)
+        else:
+            clusters.append([run[0], [run]])
+
+    kept = [
+        (x, members)
+        for i, (x, members) in enumerate(clusters)
+        if i == 0 or len(members) >= sum(crosses(run, x) for run in runs)
+    ]
+    edges = [x for x, _ in kept]
+    starts = [
+        x
+        for x, members in kept
+        if any(not any(spans(run, edge) for edge in edges) for run in members)
+    ]
+    return starts or edges[:1]
+
+
+def reconstruct_table(rows):
+    """
+    Rebuild a table block from the words of its rows.
+
+    Columns start where cell runs of any row start (`column_starts`), so a
+    column filled in only a few rows still gets its own cells and a caption
+    spanning several columns does not merge them. Each word then lands in
+    the column its left edge falls in, so blank cells stay blank instead of
+    shifting the rest of the row left.
+
+    Returns a list of rows, each a list of cell strings of equal length.
+    """
+    starts = column_starts(rows)
+    if not starts:
+        return []
+
+    # Words, not runs, are placed: a gap just under GAP_THRESHOLD between
+    # two columns still puts each word in the column it starts in.
+    table = []
+    for words in rows:
+        cells = [""] * len(starts)
+        for w in words:
+            col = max(bisect_right(starts, float(w["x0"]) + COLUMN_TOLERANCE) - 1, 0)
+            cells[col] = f"{cells[col]} {w['text']}" if cells[col] else w["text"]
+        table.append(cells)
+    return table
+
+
+IMAGE_MIN_SIZE = 4  # pdf units; smaller images are spacers/artifacts
+IMAGE_RENDER_RESOLUTION = 150
+
+
+def hash_pdf_value(digest, value, depth=0):
+    """
+    Feed a PDF object into `digest` by content. References are resolved and
+    streams (soft masks, ICC profiles, indexed palettes) contribute their
+    encoded bytes, so the same image hashes the same in every document:
+    object numbers never reach the digest.
+    """
+    from pdfminer.pdftypes import PDFStream, resolve1
+    from pdfminer.psparser import PSLiteral
+
+    value = resolve1(value)
+    if depth > 8:  # guards against reference cycles
+        digest.update(b"...")
+    elif isinstance(value, PDFStream):
+        digest.update(b"<stream")
+        hash_pdf_value(digest, {k: v for k, v in value.attrs.items() if k != "Length"}, depth + 1)
+        raw = value.get_rawdata()
+        digest.update(raw if raw is not None else value.get_data())
+        digest.update(b">")
+    elif isinstance(value, dict):
+        digest.update(b"<<")
+        for key in sorted(value):
+            digest.update(str(key).encode("utf-8") + b" ")
+            hash_pdf_value(digest, value[key], depth + 1)
+        digest.update(b">>")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            hash_pdf_value(digest, item, depth + 1)
+        digest.update(b"]")
+    elif isinstance(value, PSLiteral):
+        digest.update(b"/" + str(value.name).encode("utf-8") + b" ")
+    elif isinstance(value, bytes):
+        digest.update(b"(" + value + b")")
+    else:
+        digest.update(repr(value).encode("utf-8") + b" ")
+
+
+class ImageStore:
+    """
+    Content-addressed image assets for section bodies.
+
+    Images are keyed by a hash of their raw (still encoded) stream and its
+    decoding parameters (references resolved, soft masks hashed by content),
+    so duplicates are recognised before any decoding, across documents too.
+    Baseline RGB/grey JPEGs are written as-is; JPEG 2000, CMYK JPEGs and
+    simple RGB/grey rasters are converted to PNG; anything else is rendered
+    from the page region.
+    """
+
+    def __init__(self, asset_dir, url_prefix=None):
+        self.asset_dir = Path(asset_dir)
+        self.url_prefix = url_prefix if url_prefix is not None else self.asset_dir.as_posix()
+        self._urls: Dict[str, str] = {}
+        self.written = 0
+        self.reused = 0
+
+    @staticmethod
+    def image_key(image):
+        stream = image["stream"]
+        digest = hashlib.sha256(stream.get_rawdata() or b"")
+        for key in ("Width", "Height", "BitsPerComponent", "ColorSpace",
+                    "Filter", "DecodeParms", "Decode", "SMask", "ImageMask"):
+            digest.update(key.encode("utf-8"))
+            hash_pdf_value(digest, stream.attrs.get(key))
+        return digest.hexdigest()[:20]
+
+    def _existing(self, key):
+        for path in self.asset_dir.glob(key + ".*"):
+            return path.name
+        return None
+
+    def _write(self, page, image, key):
+        stream = image["stream"]
+        filters = [str(getattr(name, "name", name)) for name, _ in stream.get_filters()]
+        path = self.asset_dir / (key + ".png")
+        from PIL import Image  # pdfplumber dependency; only needed here
+
+        # Decode a copy: pdfminer drops `rawdata` once a stream is decoded,
+        # and XObjects shared between pages must still hash the same.
+        # JPEG/JPEG 2000 payloads are left encoded by pdfminer. Only baseline
+        # RGB/grey JPEGs are stored as-is; browsers cannot show JPEG 2000
+        # (Chromium, Edge, Teams) or reliably show CMYK JPEGs, so those are
+        # decoded with Pillow and saved as PNG.
+        if filters and filters[-1] in ("DCTDecode", "JPXDecode"):
+            encoded = copy.copy(stream).get_data()
+            try:
+                with Image.open(BytesIO(encoded)) as decoded:
+                    if (decoded.format == "JPEG" and decoded.mode in ("RGB", "L")
+                            and not decoded.info.get("progressive")):
+                        path = self.asset_dir / (key + ".jpg")
+                        path.write_bytes(encoded)
+                        return path.name
+                    if decoded.mode not in ("RGB", "L", "RGBA", "LA"):
+                        decoded = decoded.convert("RGB")
+                    decoded.save(path)
+                    return path.name
+            except (OSError, ValueError):
+                pass  # undecodable here (e.g. no OpenJPEG); render instead
+
+        colorspace = repr(stream.attrs.get("ColorSpace"))
+        mode = "RGB" if "DeviceRGB" in colorspace else "L" if "DeviceGray" in colorspace else None
+        width, height = image["srcsize"]
+        if mode and image.get("bits") == 8 and not stream.attrs.get("SMask"):
+            data = copy.copy(stream).get_data()
+            try:
+                Image.frombytes(mode, (int(width), int(height)), data).save(path)
+                return path.name
+            except (ValueError, TypeError):
+                pass
+
+        bbox = (
+            max(image["x0"], page.bbox[0]),
+            max(image["top"], page.bbox[1]),
+            min(image["x1"], page.bbox[2]),
+            min(image["bottom"], page.bbox[3]),
+        )
+        page.crop(bbox).to_image(resolution=IMAGE_RENDER_RESOLUTION).original.save(path)
+        return path.name
+
+    def add(self, page, image):
+        """Store `image` (a pdfplumber image dict) once; return its URL."""
+        key = self.image_key(image)
+        if key in self._urls:
+            self.reused += 1
+            return self._urls[key]
+
+        self.asset_dir.mkdir(parents=True, exist_ok=True)
+        name = self._existing(key)
+        if name:
+            self.reused += 1
+        else:
+            name = self._write(page, image, key)
+            self.written += 1
+        url = f"{self.url_prefix.rstrip('/')}/{name}"
+        self._urls[key] = url
+        return url
+
+    def page_images(self, page):
+        """Return [(top, url)] for the meaningful images on a page."""
+        found = []
+        for image in page.images:
+            if (image["x1"] - image["x0"] < IMAGE_MIN_SIZE
+                    or image["bottom"] - image["top"] < IMAGE_MIN_SIZE):
+                continue
+            found.append((float(image["top"]), self.add(page, image)))
+        return sorted(found)
+
+
+WORD_QUANT = 10  # word-layer coordinates are stored in 1/10 pdf units
+
+
+def encode_word_shard(words, width, height):
+    """
+    Compact form of one page's word boxes for the viewer's find layer.
+
+    `boxes` holds four integers per word, in units of 1/WORD_QUANT pt:
+    x0 and top as deltas from the previous word (words are sorted into
+    line order, which keeps them small), then width and height.
+    """
+    texts = []
+    boxes = []
+    prev_x0 = prev_top = 0
+    for w in sorted(words, key=lambda w: (round(float(w["top"]), 1), float(w["x0"]))):
+        x0 = round(float(w["x0"]) * WORD_QUANT)
+        top = round(float(w["top"]) * WORD_QUANT)
+        boxes.extend(
+            (
+                x0 - prev_x0,
+                top - prev_top,
+                round(float(w["x1"]) * WORD_QUANT) - x0,
+                round(float(w["bottom"]) * WORD_QUANT) - top,
+            )
+        )
+        texts.append(w["text"])
+        prev_x0, prev_top = x0, top
+    return {
+        "size": [round(float(width), 1), round(float(height), 1)],
+        "quant": WORD_QUANT,
+        "words": texts,
+        "boxes": boxes,
+    }
+
+
+def decode_word_shard(shard) -> List[Dict[str, Any]]:
+    """Inverse of `encode_word_shard`: word dicts with text/x0/x1/top/bottom."""
+    quant = shard.get("quant", WORD_QUANT)
+    boxes = shard["boxes"]
+    words = []
+    x0 = top = 0
+    for i, text in enumerate(shard["words"]):
+        dx0, dtop, width, height = boxes[4 * i : 4 * i + 4]
+        x0 += dx0
+        top += dtop
+        words.append(
+            {
+                "text": text,
+                "x0": x0 / quant,
+                "x1": (x0 + width) / quant,
+                "top": top / quant,
+                "bottom": (top + height) / quant,
+            }
+        )
+    return words
+
+
+def encode_word_index(page_words_by_number, n_pages):
+    """
+    Which pages each distinct word occurs on, for the viewer's find
+    prefilter: `words` is the sorted vocabulary and `postings[i]` the pages
+    of `words[i]`, delta-encoded. Built from the same words as the shards,
+    so a page missing from the index cannot hold a match.
+    """
+    postings: Dict[str, List[int]] = {}
+    for page_number in sorted(page_words_by_number):
+        for text in page_words_by_number[page_number]:
+            postings.setdefault(text, []).append(page_number)
+    words = sorted(postings)
+    encoded = []
+    for text in words:
+        previous = 0
+        deltas = []
+        for page_number in postings[text]:
+            deltas.append(page_number - previous)
+            previous = page_number
+        encoded.append(deltas)
+    return {"pages": n_pages, "words": words, "postings": encoded}
+
+
+class WordLayer:
+    """
+    Per-page word boxes for find-in-document in the viewer, written as one
+    small JSON shard per page (`DIR/<page>.json`) so the viewer only
+    fetches the pages it searches, plus `DIR/index.json` (see
+    `encode_word_index`) telling it which pages those are. Pages already
+    split into words by `PageLines` are reused; `finish` extracts the rest.
+    """
+
+    def __init__(self, out_dir, url_prefix=None):
+        self.out_dir = Path(out_dir)
+        self.url_prefix = url_prefix if url_prefix is not None else self.out_dir.as_posix()
+        self.pages = set()
+        self._page_words: Dict[int, set] = {}
+
+    def add_page(self, page_number, page, words):
+        if page_number in self.pages:
+            return
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        shard = encode_word_shard(words, page.width, page.height)
+        (self.out_dir / f"{page_number}.json").write_text(
+            json.dumps(shard, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+        )
+        self.pages.add(page_number)
+        self._page_words[page_number] = set(shard["words"])
+
+    def finish(self, pdf_path, max_pages=None) -> Dict[str, Any]:
+        """Write shards for the remaining pages and the index; return the `word_layer` entry."""
+        with open_pdf(pdf_path) as pdf:
+            n_pages = len(pdf.pages)
+            if max_pages is not None:
+                n_pages = min(max_pages, n_pages)
+            for page_number in range(1, n_pages + 1):
+                if page_number not in self.pages:
+                    page = pdf.pages[page_number - 1]
+                    self.add_page(page_number, page, page_words(page))
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        index = encode_word_index(self._page_words, n_pages)
+        (self.out_dir / "index.json").write_text(
+            json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+        )
+        return {"url": self.url_prefix.rstrip("/"), "pages": n_pages}
+
+
+def _in_bounds(top, min_top, max_top):
+    if min_top is not None and top < min_top - 0.2:
+        return False
+    if max_top is not None and top >= max_top - 0.2:
+        return False
+    return True
+
+
+class PageLines:
+    """
+    Words of one page grouped into lines once, then sliced by vertical
+    bounds for every section that overlaps the page. With an `ImageStore`,
+    the page's images are stored and merged into the lines by position;
+    with a `HeaderFooterFilter`, running headers/footers are dropped.
+    """
+
+    def __init__(self, page, image_store=None, header_footer=None):
+        self.images = image_store.page_images(page) if image_store else []
+        words = page_words(page)
+        self.words = words
+        grouped = {}
+        for w in words:
+            grouped.setdefault(round(float(w["top"]), 1), []).append(w)
+
+        # (line words left-to-right, min/max word top, assembled text + type)
+        self.lines = []
+        page_height = float(page.height)
+        for key in sorted(grouped.keys()):
+            line_words = sorted(grouped[key], key=lambda item: item["x0"])
+            assembled = assemble_line(line_words)
+            if header_footer and header_footer.is_header_footer(assembled[0], key, page_height):
+                continue
+            tops = [float(w["top"]) for w in line_words]
+            self.lines.append((line_words, min(tops), max(tops), assembled))
+
+    def between(self, min_top=None, max_top=None):
+        """
+        Return ordered line dicts (text + type) within optional bounds.
+        Lines with column gaps also carry their `words`, so table blocks can
+        be rebuilt geometrically by `reconstruct_table`.
+        """
+        lines = []
+        for line_words, lo, hi, assembled in self.lines:
+            if _in_bounds(lo, min_top, max_top) and _in_bounds(hi, min_top, max_top):
+                kept = line_words
+                text, line_type = assembled
+            else:
+                kept = [w for w in line_words if _in_bounds(float(w["top"]), min_top, max_top)]
+                if not kept:
+                    continue
+                text, line_type = assemble_line(kept)
+            if text:
+                line = {"text": text, "type": line_type, "top": lo}
+                if line_type != "bullet" and len(split_cells(kept)) > 1:
+                    line["words"] = kept
+                lines.append(line)
+
+        images = [
+            {"text": "", "type": "image", "top": top, "src": src}
+            for top, src in self.images
+            if _in_bounds(top, min_top, max_top)
+        ]
+        if images:
+            lines = sorted(lines + images, key=lambda line: line["top"])
+        return lines
+
+
+def extract_lines_from_page(page, min_top=None, max_top=None):
+    """Return ordered line dicts (text + type) within optional bounds."""
+    return PageLines(page).between(min_top=min_top, max_top=max_top)
+
+
+def format_lines_as_html(lines):
+    """Convert classified lines into lightweight semantic HTML."""
+    html_parts = []
+    list_buffer: List[str] = []
+    table_buffer: List[Dict[str, Any]] = []
+
+    bullet_strip_chars = "".join(BULLET_CHARS + (" ",))
+
+    def flush_list():
+        if list_buffer:
+            items = "".join(f"<li>{escape(item)}</li>" for item in list_buffer)
+            html_parts.append(f"<ul>{items}</ul>")
+            list_buffer.clear()
+
+    def flush_table():
+        if table_buffer:
+            if all("words" in line for line in table_buffer):
+                grid = reconstruct_table([line["words"] for line in table_buffer])
+            else:
+                # Plain text lines (no word boxes): split on the column padding
+                grid = [
+                    [cell for cell in re.split(r"\s{2,}", line["text"].strip()) if cell.strip()]
+                    for line in table_buffer
+                ]
+            rows = []
+            for cells in grid:
+                if any(cell.strip() for cell in cells):
+                    rows.append(
+                        "<tr>"
+                        + "".join(f"<td>{escape(cell.strip())}</td>" for cell in cells)
+                        + "</tr>"
+                    )
+            if rows:
+                html_parts.append(f"<table>{''.join(rows)}</table>")
+            table_buffer.clear()
+
+    for line in lines:
+        text = line["text"]
+        line_type = line["type"]
+
+        if line_type == "image":
+            flush_list()
+            flush_table()
+            html_parts.append(
+                f'<figure><img src="{escape(line["src"])}" alt="" loading="lazy" /></figure>'
+            )
+            continue
+
+        if line_type == "bullet":
+            flush_table()
+            stripped = text.lstrip(bullet_strip_chars).strip()
+            list_buffer.append(stripped or text.strip())
+            continue
+
+        # Rows with blank cells have fewer gaps than the rest of the table;
+        # keep them in the block as long as they still have columns.
+        if line_type == "table" or (table_buffer and "words" in line):
+            flush_list()
+            table_buffer.append(line)
+            continue
+
+        if not text.strip():
+            flush_list()
+            flush_table()
+            continue
+
+        flush_list()
+        flush_table()
+        html_parts.append(f"<p>{escape(text.strip())}</p>")
+
+    flush_list()
+    flush_table()
+
+    if not html_parts:
+        return '<p class="text-muted">No text detected for this section.</p>'
+
+    return "".join(html_parts)
+
+
+def attach_section_html(pdf_path, headings, image_store=None, header_footer=None,
+                        word_layer=None):
+    """
+    Populate each heading with an HTML snippet for its body. Pass an
+    `ImageStore` to include the section's images as <figure> elements, and
+    a `HeaderFooterFilter` to leave running headers/footers out. A
+    `WordLayer` gets the words of every page this pass reads.
+    """
+    with open_pdf(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        page_lines: Dict[int, PageLines] = {}
+
+        for idx, heading in enumerate(headings):
+            start_page = heading["page"]
+            start_top = heading["top"]
+
+            end_page = total_pages
+            end_top: Optional[float] = None
+            heading_level = heading.get("level")
+
+            for next_heading in headings[idx + 1 :]:
+                next_level = next_heading.get("level")
+                if heading_level is None or next_level is None:
+                    continue
+                if next_level <= heading_level:
+                    end_page = next_heading["page"]
+                    end_top = next_heading["top"]
+                    break
+
+            section_lines = []
+            for page_num in range(start_page, end_page + 1):
+                if page_num not in page_lines:
+                    page = pdf.pages[page_num - 1]
+                    page_lines[page_num] = PageLines(page, image_store, header_footer)
+                    if word_layer is not None:
+                        word_layer.add_page(page_num, page, page_lines[page_num].words)
+                min_top = None
+                max_top = None
+                if page_num == start_page:
+                    min_top = start_top + 0.5  # skip the heading line itself
+                if end_top is not None and page_num == end_page:
+                    max_top = end_top
+                section_lines.extend(
+                    page_lines[page_num].between(min_top=min_top, max_top=max_top)
+                )
+
+            heading["content_html"] = format_lines_as_html(section_lines)
+
+
+def page_dimensions(pdf_path):
+    """Return [width, height] in PDF points for every page (viewer layout)."""
+    with open_pdf(pdf_path) as pdf:
+        return [
+            [round(float(page.width), 1), round(float(page.height), 1)]
+            for page in pdf.pages
+        ]
+
+
+def build_tree(headings):
+    """
+    Build a simple parent/children tree from a flat list of headings.
+
+    Rule:
+    - A heading is a child of the previous heading with a lower level.
+    """
+    tree = []
+    stack = []
+
+    def level_value(item):
+        level = item.get("level")
+        if isinstance(level, (int, float)):
+            return level
+        return float("inf")
+
+    for h in headings:
+        node = dict(h)
+        node["children"] = []
+
+        current_level = level_value(node)
+
+        # Pop until we find a parent with a lower level
+        while stack and level_value(stack[-1]) >= current_level:
+            stack.pop()
+
+        if stack:
+            stack[-1]["children"].append(node)
+        else:
+            tree.append(node)
+
+        stack.append(node)
+
+    return tree
+
+
+def print_tree(nodes, indent=0):
+    """Pretty-print the heading tree to stdout."""
+    for n in nodes:
+        prefix = "  " * indent
+        print("%s- (L%d, p%d) %s" % (prefix, n["level"], n["page"], n["text"]))
+        if n.get("children"):
+            print_tree(n["children"], indent + 1)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Detect headings/subheadings in a PDF by font-size heuristics."
+    )
+    parser.add_argument("pdf", help="Path to the input PDF file")
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Only scan the first N pages (useful for testing)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the heading tree as JSON instead of pretty text",
+    )
+    parser.add_argument(
+        "--full-heading-scan",
+        action="store_true",
+        help="Cluster every character when looking for headings, not just heading-size ones",
+    )
+    parser.add_argument(
+        "--images",
+        metavar="DIR",
+        default=None,
+        help="Extract embedded images into DIR (content-addressed, deduplicated) "
+             "and reference them from section bodies",
+    )
+    parser.add_argument(
+        "--words",
+        metavar="DIR",
+        default=None,
+        help="Write per-page word boxes into DIR for the viewer's find-in-document",
+    )
+    parser.add_argument(
+        "--keep-headers-footers",
+        action="store_true",
+        help="Keep running headers, footers and page numbers in section bodies",
+    )
+
+    args = parser.parse_args(argv)
+
+    # One open PDF for every stage, so each page is parsed only once
+    with open_pdf(args.pdf) as pdf:
+        header_footer = None
+        if not args.keep_headers_footers:
+            header_footer = HeaderFooterFilter(pdf, max_pages=args.max_pages)
+
+        body_size, heading_sizes, headings, size_counts = extract_headings(
+            pdf,
+            max_pages=args.max_pages,
+            heading_chars_only=not args.full_heading_scan,
+            header_footer=header_footer,
+        )
+
+        image_store = ImageStore(args.images) if args.images else None
+        word_layer = WordLayer(args.words) if args.words else None
+        attach_section_html(
+            pdf,
+            headings,
+            image_store=image_store,
+            header_footer=header_footer,
+            word_layer=word_layer,
+        )
+        page_sizes = page_dimensions(pdf)
+        word_layer_info = word_layer.finish(pdf, max_pages=args.max_pages) if word_layer else None
+
+    tree = build_tree(headings)
+
+    if args.json:
+        payload = {
+            "pdf": Path(args.pdf).name,
+            "pdf_path": args.pdf,
+            "page_sizes": page_sizes,
+            "headings": tree,
+        }
+        if word_layer_info:
+            payload["word_layer"] = word_layer_info
+        print(json.dumps(payload, indent=2))
+    else:
+        print("Body font size (most common):", body_size)
+        print("Detected heading font sizes (largest first):", heading_sizes)
+        if header_footer is not None:
+            print("Recurring header/footer lines removed:", len(header_footer))
+        print()
+        print_tree(tree)
+
+
+if __name__ == "__main__":
+    main()
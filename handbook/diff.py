@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Diff two headings.json outputs (e.g. two editions of a handbook) and write
+a delta file so downstream consumers only re-index what changed.
+
+Headings are matched by stable content hashes rather than by id or page:
+
+- text key:    hash of the heading text, case-folded, whitespace-collapsed
+               and with any leading section number ("3.3", "8.1.2") removed
+- content key: hash of the text key plus the normalised plain text of the
+               heading's own body, up to its first subsection; an edit in
+               3.1 changes 3.1 only, not "3." and the chapter above it
+
+Each heading in the new edition is then classified as:
+
+- unchanged: same content key, same text, parent path and position
+- moved:     same content key, but renumbered, re-parented or on another
+             page / at another offset
+- changed:   same text key, different body
+- added:     no match in the old edition
+and every unmatched old heading is reported as removed.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Dict, Any
+
+from .index import HandbookIndex
+
+DELTA_FORMAT = "handbook-delta/1"
+SECTION_NUMBER_RE = re.compile(r"^\s*\d+(?:\.\d+)*\.?\s+")
+TOP_TOLERANCE = 1.0  # pdf units; smaller shifts are layout noise, not moves
+
+
+def normalize_text(text):
+    """Case-fold and collapse whitespace."""
+    return " ".join((text or "").split()).casefold()
+
+
+def text_key(text):
+    stripped = SECTION_NUMBER_RE.sub("", text or "")
+    return hashlib.sha1(normalize_text(stripped).encode("utf-8")).hexdigest()[:16]
+
+
+def content_key(t_key, body_text):
+    digest = hashlib.sha1(t_key.encode("ascii"))
+    digest.update(b"\0")
+    digest.update(normalize_text(body_text).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def fingerprint(index):
+    """Per-heading keys and location info for one edition, in reading order."""
+    entries = []
+    for node in index:
+        heading_id = node["id"]
+        t_key = text_key(node["text"])
+        entries.append(
+            {
+                "id": heading_id,
+                "text": node["text"],
+                "level": node.get("level"),
+                "page": node["page"],
+                "top": node["top"],
+                "path": [a["text"] for a in index.ancestors(heading_id)],
+                "path_keys": [text_key(a["text"]) for a in index.ancestors(heading_id)],
+                "text_key": t_key,
+                "content_key": content_key(t_key, index.own_section_text(heading_id)),
+            }
+        )
+    return entries
+
+
+def _location(entry):
+    return {"page": entry["page"], "top": entry["top"], "path": entry["path"]}
+
+
+def _moved(old, new):
+    return (
+        old["text"] != new["text"]
+        or old["path_keys"] != new["path_keys"]
+        or old["page"] != new["page"]
+        or abs(old["top"] - new["top"]) > TOP_TOLERANCE
+    )
+
+
+def diff_editions(old_index, new_index):
+    """Compare two HandbookIndex objects and return the delta payload."""
+    old_entries = fingerprint(old_index)
+    new_entries = fingerprint(new_index)
+
+    pairs = []  # (old_entry, new_entry, kind)
+    matched_old = set()
+    unmatched_new = []
+
+    # Pass 1: identical text + body. Duplicates pair up in reading order.
+    by_content = defaultdict(deque)
+    for entry in old_entries:
+        by_content[entry["content_key"]].append(entry)
+    for entry in new_entries:
+        candidates = by_content.get(entry["content_key"])
+        if candidates:
+            old = candidates.popleft()
+            matched_old.add(old["id"])
+            pairs.append((old, entry, "moved" if _moved(old, entry) else "unchanged"))
+        else:
+            unmatched_new.append(entry)
+
+    # Pass 2: same heading, edited body.
+    by_text = defaultdict(deque)
+    for entry in old_entries:
+        if entry["id"] not in matched_old:
+            by_text[entry["text_key"]].append(entry)
+    added = []
+    for entry in unmatched_new:
+        candidates = by_text.get(entry["text_key"])
+        if candidates:
+            old = candidates.popleft()
+            matched_old.add(old["id"])
+            pairs.append((old, entry, "changed"))
+        else:
+            added.append(entry)
+
+    removed = [entry for entry in old_entries if entry["id"] not in matched_old]
+
+    def section_payload(entry):
+        return {
+            "id": entry["id"],
+            "key": entry["content_key"],
+            "text": entry["text"],
+            "level": entry["level"],
+            "page": entry["page"],
+            "top": entry["top"],
+            "path": entry["path"],
+            "content_html": new_index.own_section_html(entry["id"]),
+        }
+
+    delta: Dict[str, Any] = {
+        "format": DELTA_FORMAT,
+        "old": {"pdf": old_index.meta.get("pdf"), "sections": len(old_entries)},
+        "new": {"pdf": new_index.meta.get("pdf"), "sections": len(new_entries)},
+        "added": [section_payload(e) for e in added],
+        "removed": [
+            {"old_id": e["id"], "key": e["content_key"], "text": e["text"]}
+            for e in removed
+        ],
+        "moved": [],
+        "changed": [],
+        "id_map": {},
+    }
+
+    for old, new, kind in sorted(pairs, key=lambda p: (p[1]["page"], p[1]["top"])):
+        delta["id_map"][str(old["id"])] = new["id"]
+        if kind == "moved":
+            delta["moved"].append(
+                {
+                    "old_id": old["id"],
+                    "id": new["id"],
+                    "key": new["content_key"],
+                    "text": new["text"],
+                    "from": _location(old),
+                    "to": _location(new),
+                }
+            )
+        elif kind == "changed":
+            entry = section_payload(new)
+            entry["old_id"] = old["id"]
+            entry["old_key"] = old["content_key"]
+            delta["changed"].append(entry)
+
+    kinds = [kind for _, _, kind in pairs]
+    delta["summary"] = {
+        "added": len(added),
+        "removed": len(removed),
+        "moved": kinds.count("moved"),
+        "changed": kinds.count("changed"),
+        "unchanged": kinds.count("unchanged"),
+    }
+    return delta
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Diff two headings.json editions and emit a re-indexing delta."
+    )
+    parser.add_argument("old", help="headings.json of the previous edition")
+    parser.add_argument("new", help="headings.json of the new edition")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Write the delta JSON here (default: print a summary only)",
+    )
+
+    args = parser.parse_args(argv)
+
+    with HandbookIndex(args.old) as old_index, HandbookIndex(args.new) as new_index:
+        delta = diff_editions(old_index, new_index)
+
+    summary = delta["summary"]
+    print(
+        "added %(added)d, removed %(removed)d, moved %(moved)d, "
+        "changed %(changed)d, unchanged %(unchanged)d" % summary
+    )
+    for kind in ("added", "removed", "moved", "changed"):
+        for entry in delta[kind]:
+            print(f"  {kind:8s} {entry['text']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(delta, indent=2), encoding="utf-8")
+        print(f"✅ Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
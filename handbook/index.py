@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Query-side API over headings.json (output from detect_headings.py --json).
+
+`HandbookIndex` loads the file once, on first use, and keeps flat lookup
+tables so a backend can answer questions without re-walking the tree:
+
+- get(id), parent(id), ancestors(id), children(id)   -> O(1) / O(depth)
+- section_at(page, top)                                -> O(log n) bisect
+- section_html(id) / section_text(id)                 -> lazy, memory-mapped
+- own_section_html(id) / own_section_text(id)         -> body without subsections
+
+Section bodies (`content_html`) make up almost all of the file, so they are
+not decoded up front. The file is memory-mapped, the byte span of every
+`content_html` string is recorded, and only the remaining skeleton is parsed
+as JSON. A body is decoded from the map the first time it is asked for.
+"""
+
+import argparse
+import json
+import mmap
+import re
+from bisect import bisect_right
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+# Matches `"content_html": "<json string>"` in the raw file. Quotes inside a
+# JSON string are always escaped, so this cannot fire inside heading text.
+CONTENT_HTML_RE = re.compile(rb'"content_html"\s*:\s*("(?:[^"\\]|\\.)*")', re.DOTALL)
+
+NODE_SKIP_KEYS = ("children", "content_html")
+BLOCK_TAGS = {"p", "li", "tr", "ul", "table", "br"}
+PARAGRAPH_RE = re.compile(r"<p>(.*?)</p>", re.DOTALL)
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag == "td":
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def section_plain_text(content_html):
+    """Strip the lightweight HTML from `format_lines_as_html` back to text."""
+    if not content_html:
+        return ""
+    parser = _TextExtractor()
+    parser.feed(content_html)
+    parser.close()
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class HandbookIndex:
+    """Flat, read-only index over a headings.json payload."""
+
+    def __init__(self, json_path):
+        self.json_path = Path(json_path)
+        self._meta: Dict[str, Any] = {}
+        self._loaded = False
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._nodes: Dict[int, Dict[str, Any]] = {}
+        self._roots: List[int] = []
+        self._body_spans: Dict[int, Tuple[int, int]] = {}
+        self._body_cache: Dict[int, str] = {}
+        self._positions: List[Tuple[int, float]] = []
+        self._position_ids: List[int] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._nodes)
+
+    def __contains__(self, heading_id):
+        self._ensure_loaded()
+        return heading_id in self._nodes
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """Top-level keys of the payload other than `headings` (pdf, page_sizes, ...)."""
+        self._ensure_loaded()
+        return self._meta
+
+    def __iter__(self):
+        """Iterate heading records in reading order (page, then top)."""
+        self._ensure_loaded()
+        return (self._nodes[i] for i in self._position_ids)
+
+    def close(self):
+        """Release the memory map and file handle."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        self._file = open(self.json_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Cut every content_html string out of the raw bytes, leaving its
+        # ordinal in its place, so json.loads only sees the small skeleton.
+        spans = []
+        pieces = []
+        cursor = 0
+        for match in CONTENT_HTML_RE.finditer(self._map):
+            start, end = match.span(1)
+            pieces.append(self._map[cursor:start])
+            pieces.append(str(len(spans)).encode("ascii"))
+            spans.append((start, end))
+            cursor = end
+        pieces.append(self._map[cursor:])
+        data = json.loads(b"".join(pieces))
+
+        if isinstance(data, list):
+            tree = data
+        else:
+            tree = data.get("headings", [])
+            self._meta = {k: v for k, v in data.items() if k != "headings"}
+
+        def walk(nodes, parent_id):
+            child_ids = []
+            for node in nodes:
+                heading_id = node["id"]
+                record = {k: v for k, v in node.items() if k not in NODE_SKIP_KEYS}
+                record["parent"] = parent_id
+                self._nodes[heading_id] = record
+
+                body_ref = node.get("content_html")
+                if isinstance(body_ref, int):
+                    self._body_spans[heading_id] = spans[body_ref]
+
+                record["children"] = walk(node.get("children") or [], heading_id)
+                child_ids.append(heading_id)
+            return child_ids
+
+        self._roots = walk(tree, None)
+
+        ordered = sorted(
+            self._nodes.values(), key=lambda n: (n["page"], n["top"], n["id"])
+        )
+        self._positions = [(n["page"], n["top"]) for n in ordered]
+        self._position_ids = [n["id"] for n in ordered]
+        self._loaded = True
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, heading_id) -> Dict[str, Any]:
+        """Return the heading record (no body); raises KeyError if unknown."""
+        self._ensure_loaded()
+        return self._nodes[heading_id]
+
+    def roots(self) -> List[Dict[str, Any]]:
+        """Top-level headings in reading order."""
+        self._ensure_loaded()
+        return [self._nodes[i] for i in self._roots]
+
+    def parent(self, heading_id) -> Optional[Dict[str, Any]]:
+        """Return the parent heading, or None for a top-level heading."""
+        parent_id = self.get(heading_id)["parent"]
+        if parent_id is None:
+            return None
+        return self._nodes[parent_id]
+
+    def ancestors(self, heading_id) -> List[Dict[str, Any]]:
+        """Return the path from the root down to (not including) this heading."""
+        path = []
+        parent_id = self.get(heading_id)["parent"]
+        while parent_id is not None:
+            node = self._nodes[parent_id]
+            path.append(node)
+            parent_id = node["parent"]
+        path.reverse()
+        return path
+
+    def children(self, heading_id) -> List[Dict[str, Any]]:
+        """Return the direct children of a heading in reading order."""
+        return [self._nodes[i] for i in self.get(heading_id)["children"]]
+
+    def section_at(self, page, top=0.0) -> Optional[Dict[str, Any]]:
+        """
+        Return the heading whose section covers `page` at y-offset `top`,
+        i.e. the last heading at or above that position in reading order.
+        Returns None for positions before the first heading.
+        """
+        self._ensure_loaded()
+        pos = bisect_right(self._positions, (page, top))
+        if pos == 0:
+            return None
+        return self._nodes[self._position_ids[pos - 1]]
+
+    def section_html(self, heading_id, cache=True) -> Optional[str]:
+        """
+        Decode (once) and return the heading's `content_html`, if any.
+        Pass `cache=False` when streaming every section, so memory stays flat.
+        """
+        self.get(heading_id)
+        if heading_id in self._body_cache:
+            return self._body_cache[heading_id]
+        span = self._body_spans.get(heading_id)
+        if span is None:
+            return None
+        start, end = span
+        body = json.loads(self._map[start:end])
+        if cache:
+            self._body_cache[heading_id] = body
+        return body
+
+    def section_text(self, heading_id, cache=True) -> str:
+        """Plain text of the heading's section body ("" if it has none)."""
+        return section_plain_text(self.section_html(heading_id, cache=cache))
+
+    def own_section_html(self, heading_id, cache=True) -> Optional[str]:
+        """
+        The part of the section body that belongs to this heading alone. A
+        parent's `content_html` runs to the next heading of the same level,
+        so it is cut at its first child's heading line.
+        """
+        body = self.section_html(heading_id, cache=cache)
+        children = self.get(heading_id)["children"]
+        if not body or not children:
+            return body
+        first_child = " ".join(self._nodes[children[0]]["text"].split())
+        for match in PARAGRAPH_RE.finditer(body):
+            if section_plain_text(match.group(1)) == first_child:
+                return body[: match.start()]
+        return body
+
+    def own_section_text(self, heading_id, cache=True) -> str:
+        """Plain text of `own_section_html` ("" if there is none)."""
+        return section_plain_text(self.own_section_html(heading_id, cache=cache))
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Look up sections in a headings.json file."
+    )
+    parser.add_argument("json", help="Path to headings.json")
+    parser.add_argument("--id", type=int, default=None, help="Heading id to show")
+    parser.add_argument("--page", type=int, default=None, help="Find the section covering this page")
+    parser.add_argument("--top", type=float, default=0.0, help="Y-offset on --page (default: top of page)")
+    parser.add_argument("--html", action="store_true", help="Also print the section body HTML")
+
+    args = parser.parse_args(argv)
+
+    with HandbookIndex(args.json) as index:
+        if args.id is not None:
+            node = index.get(args.id)
+        elif args.page is not None:
+            node = index.section_at(args.page, args.top)
+        else:
+            parser.error("pass --id or --page")
+
+        if node is None:
+            print("No section covers that position.")
+            return
+
+        path = " > ".join(a["text"] for a in index.ancestors(node["id"]))
+        print("- (L%d, p%d) %s" % (node["level"], node["page"], node["text"]))
+        if path:
+            print("  in:", path)
+        if args.html:
+            print(index.section_html(node["id"]) or "")
+
+
+if __name__ == "__main__":
+    main()
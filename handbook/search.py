@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Fuzzy section search over headings.json using character n-gram TF-IDF.
+
+Typos and loose phrasing ("paracetmol dose for kids") still share most of
+their 3-5 character n-grams with the heading/body they are after, so cosine
+similarity over n-gram TF-IDF vectors finds them where a substring match
+on heading text does not.
+
+- Features are hashed (crc32) into a fixed number of buckets, so there is
+  no vocabulary to store. The index is saved as a single compressed .npz
+  holding the sparse (CSR) document matrix - column indices delta-encoded
+  per row, weights as float16 - the idf of seen features and heading
+  metadata.
+- Queries are scored in batches: every query n-gram is looked up in a
+  term-major copy of the matrix and all partial products are summed with a
+  single np.bincount, so N queries cost one pass instead of N.
+
+Everything runs locally with NumPy; there are no model downloads.
+"""
+
+import argparse
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from .index import section_plain_text
+
+NGRAM_RANGE = (3, 5)
+N_FEATURES = 1 << 18
+HEADING_WEIGHT = 2.0  # heading n-grams count double against body n-grams
+
+WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def char_ngram_counts(text, weight=1.0, counts=None):
+    """Add hashed character n-gram counts for `text` into `counts`."""
+    if counts is None:
+        counts = {}
+    lo, hi = NGRAM_RANGE
+    for word in WORD_RE.findall(text.lower()):
+        padded = f" {word} "
+        for n in range(lo, hi + 1):
+            for i in range(max(len(padded) - n + 1, 1)):
+                gram = padded[i : i + n].encode("utf-8")
+                key = zlib.crc32(gram) % N_FEATURES
+                counts[key] = counts.get(key, 0.0) + weight
+    return counts
+
+
+def _csr_from_counts(rows):
+    """Sublinear-tf CSR arrays (indptr, indices, data) from per-row counts."""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    for i, counts in enumerate(rows):
+        indptr[i + 1] = indptr[i] + len(counts)
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    data = np.empty(indptr[-1], dtype=np.float32)
+    for i, counts in enumerate(rows):
+        keys = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        vals = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        order = np.argsort(keys)
+        indices[indptr[i] : indptr[i + 1]] = keys[order]
+        data[indptr[i] : indptr[i + 1]] = 1.0 + np.log(vals[order])
+    return indptr, indices, data
+
+
+def _l2_normalize(indptr, data):
+    row_ids = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_ids, weights=data.astype(np.float64) ** 2,
+                                minlength=len(indptr) - 1))
+    norms[norms == 0] = 1.0
+    data /= norms[row_ids].astype(np.float32)
+
+
+class SearchIndex:
+    """Hashed character n-gram TF-IDF index over heading sections."""
+
+    def __init__(self, indptr, indices, data, idf, ids, texts, pages):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.idf = idf
+        self.ids = ids
+        self.texts = texts
+        self.pages = pages
+        self._postings = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_headings(cls, tree):
+        """Build the index from a headings tree (detect_headings.py --json)."""
+        ids, texts, pages, rows = [], [], [], []
+
+        def walk(nodes):
+            for node in nodes:
+                counts = char_ngram_counts(node.get("text", ""), weight=HEADING_WEIGHT)
+                char_ngram_counts(section_plain_text(node.get("content_html")), counts=counts)
+                ids.append(node["id"])
+                texts.append(node.get("text", ""))
+                pages.append(node.get("page", 0))
+                rows.append(counts)
+                walk(node.get("children") or [])
+
+        walk(tree)
+
+        indptr, indices, data = _csr_from_counts(rows)
+        df = np.bincount(indices, minlength=N_FEATURES)
+        idf = (np.log((1.0 + len(rows)) / (1.0 + df)) + 1.0).astype(np.float32)
+        data *= idf[indices]
+        _l2_normalize(indptr, data)
+
+        return cls(
+            indptr,
+            indices,
+            data,
+            idf,
+            np.asarray(ids, dtype=np.int32),
+            np.asarray(texts, dtype=np.str_),
+            np.asarray(pages, dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            if tuple(npz["ngram_range"]) != NGRAM_RANGE or int(npz["n_features"]) != N_FEATURES:
+                raise ValueError(f"{path} was built with different n-gram settings; rebuild it.")
+            indptr = npz["indptr"]
+            indices = np.cumsum(npz["index_deltas"], dtype=np.int64)
+            # Undo the per-row delta encoding: subtract each row's running
+            # offset so every row starts from its own first index again.
+            row_starts = indptr[:-1][np.diff(indptr) > 0]
+            carry = np.zeros(len(indices), dtype=np.int64)
+            carry[row_starts[1:]] = indices[row_starts[1:] - 1]
+            indices = (indices - np.maximum.accumulate(carry)).astype(np.int32)
+
+            idf = np.full(N_FEATURES, npz["idf_default"], dtype=np.float32)
+            idf[npz["idf_terms"]] = npz["idf_values"]
+            return cls(
+                indptr, indices, npz["data"].astype(np.float32), idf,
+                npz["ids"], npz["texts"], npz["pages"],
+            )
+
+    def save(self, path):
+        # Column indices are sorted within each row, so small per-row deltas
+        # compress far better than the raw hashed ids.
+        deltas = np.diff(self.indices, prepend=0).astype(np.int32)
+        row_starts = self.indptr[:-1][np.diff(self.indptr) > 0]
+        deltas[row_starts] = self.indices[row_starts]
+
+        seen = np.zeros(N_FEATURES, dtype=bool)
+        seen[self.indices] = True
+        np.savez_compressed(
+            path,
+            indptr=self.indptr,
+            index_deltas=deltas,
+            data=self.data.astype(np.float16),
+            idf_terms=np.flatnonzero(seen).astype(np.int32),
+            idf_values=self.idf[seen],
+            idf_default=np.asarray(np.log(1.0 + len(self.ids)) + 1.0, dtype=np.float32),
+            ids=self.ids,
+            texts=self.texts,
+            pages=self.pages,
+            ngram_range=np.asarray(NGRAM_RANGE, dtype=np.int32),
+            n_features=np.asarray(N_FEATURES, dtype=np.int64),
+        )
+
+    def _term_postings(self):
+        """Term-major (CSC) copy of the matrix, built once on first query."""
+        if self._postings is None:
+            row_ids = np.repeat(
+                np.arange(len(self.ids), dtype=np.int32), np.diff(self.indptr)
+            )
+            order = np.argsort(self.indices, kind="stable")
+            term_indptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=N_FEATURES), out=term_indptr[1:])
+            self._postings = (term_indptr, row_ids[order], self.data[order])
+        return self._postings
+
+    def query(self, queries, top_k=5) -> List[List[Tuple[int, float]]]:
+        """
+        Score every query against every section in one batched pass.
+
+        Returns one list per query of up to `top_k` (heading_id, score)
+        pairs, best first. Sections with no shared n-grams are omitted.
+        """
+        n_docs = len(self.ids)
+        if not queries or not n_docs:
+            return [[] for _ in queries]
+
+        q_indptr, q_indices, q_data = _csr_from_counts(
+            [char_ngram_counts(q) for q in queries]
+        )
+        q_data *= self.idf[q_indices]
+        _l2_normalize(q_indptr, q_data)
+        q_rows = np.repeat(np.arange(len(queries)), np.diff(q_indptr))
+
+        # Expand each query n-gram into its posting list and accumulate
+        # weight products into a flat (query, doc) score array.
+        term_indptr, post_docs, post_data = self._term_postings()
+        starts = term_indptr[q_indices]
+        lengths = term_indptr[q_indices + 1] - starts
+        total = int(lengths.sum())
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        flat = np.repeat(q_rows, lengths) * n_docs + post_docs[offsets]
+        weights = np.repeat(q_data, lengths) * post_data[offsets]
+        scores = np.bincount(flat, weights=weights, minlength=len(queries) * n_docs)
+        scores = scores.reshape(len(queries), n_docs)
+
+        k = min(top_k, n_docs)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for q, cand in enumerate(top):
+            cand = cand[np.argsort(-scores[q, cand], kind="stable")]
+            results.append(
+                [(int(self.ids[d]), float(scores[q, d])) for d in cand if scores[q, d] > 0]
+            )
+        return results
+
+    def describe(self, heading_id) -> Dict[str, Any]:
+        pos = int(np.flatnonzero(self.ids == heading_id)[0])
+        return {"id": heading_id, "text": str(self.texts[pos]), "page": int(self.pages[pos])}
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Build or query a fuzzy (character n-gram TF-IDF) section index."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the index from headings.json")
+    build.add_argument("json", help="Path to headings.json")
+    build.add_argument("-o", "--output", default=None,
+                       help="Output .npz path (default: <json stem>.search.npz)")
+
+    query = sub.add_parser("query", help="Query a built index")
+    query.add_argument("index", help="Path to the .npz index")
+    query.add_argument("queries", nargs="+", help="One or more query strings")
+    query.add_argument("-k", "--top-k", type=int, default=5, help="Results per query")
+    query.add_argument("--json", action="store_true", help="Output results as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        json_path = Path(args.json)
+        data = json.loads(json_path.read_text(encoding="utf-8"))
+        tree = data if isinstance(data, list) else data.get("headings", [])
+        index = SearchIndex.from_headings(tree)
+        output_path = Path(args.output) if args.output else json_path.with_suffix(".search.npz")
+        index.save(output_path)
+        print(f"✅ Indexed {len(index)} sections into {output_path}")
+        return
+
+    index = SearchIndex.load(args.index)
+    results = index.query(args.queries, top_k=args.top_k)
+    if args.json:
+        payload = [
+            {
+                "query": q,
+                "results": [dict(index.describe(hid), score=round(score, 4)) for hid, score in hits],
+            }
+            for q, hits in zip(args.queries, results)
+        ]
+        print(json.dumps(payload, indent=2))
+        return
+
+    for q, hits in zip(args.queries, results):
+        print(f"{q!r}:")
+        for hid, score in hits:
+            info = index.describe(hid)
+            print("  %.3f  (p%d) %s" % (score, info["page"], info["text"]))
+
+
+if __name__ == "__main__":
+    main()
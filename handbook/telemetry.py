@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Local collector for the viewer's performance telemetry.
+
+A viewer built with `build_headings_html.py --telemetry-endpoint URL` records
+User Timing measures for its expensive steps (parsing the embedded heading
+data, rendering the sidebar, the cold pdf.js load, page renders, searches)
+and sends them in batches with navigator.sendBeacon. This script receives
+those batches and stores one row per measure in SQLite, so regressions show
+up as numbers per document and build instead of as anecdotes:
+
+    python telemetry_collector.py serve --port 8765
+    python build_headings_html.py headings.json \\
+        --telemetry-endpoint http://localhost:8765/collect
+    python telemetry_collector.py report
+
+Beacon payload (sent as text/plain to avoid a CORS preflight):
+
+    {"build": "<id>", "measures": [{"name", "duration", "doc", "at"}, ...]}
+"""
+
+import argparse
+import json
+import math
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any
+
+DEFAULT_DB = "telemetry.sqlite"
+MAX_BODY_BYTES = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS measures (
+    doc      TEXT NOT NULL,
+    build    TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    duration REAL NOT NULL,
+    ts       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measures_key ON measures (doc, build, name);
+"""
+
+
+def open_db(db_path):
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def parse_batch(body) -> List[tuple]:
+    """
+    Turn one beacon body into (doc, build, name, duration, ts) rows.
+    Raises ValueError on anything that is not a well-formed batch.
+    """
+    payload = json.loads(body)
+    if not isinstance(payload, dict) or not isinstance(payload.get("measures"), list):
+        raise ValueError("expected {'build': ..., 'measures': [...]}")
+    build = str(payload.get("build") or "")
+    rows = []
+    for measure in payload["measures"]:
+        # json accepts NaN, Infinity and 1e999; none of them fit the table
+        duration = float(measure["duration"])
+        at = float(measure.get("at") or 0)
+        if not (math.isfinite(duration) and math.isfinite(at)) or abs(at) >= 2 ** 63:
+            raise ValueError("duration and at must be finite numbers")
+        rows.append(
+            (
+                str(measure.get("doc") or ""),
+                build,
+                str(measure["name"]),
+                duration,
+                int(at),
+            )
+        )
+    return rows
+
+
+def make_handler(conn):
+    lock = threading.Lock()
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def _reply(self, status):
+            self.send_response(status)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_OPTIONS(self):
+            self._reply(204)
+
+        def do_POST(self):
+            if self.path.split("?", 1)[0] != "/collect":
+                self._reply(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if not 0 < length <= MAX_BODY_BYTES:
+                self._reply(413 if length else 400)
+                return
+            try:
+                rows = parse_batch(self.rfile.read(length))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._reply(400)
+                return
+            with lock, conn:
+                conn.executemany("INSERT INTO measures VALUES (?, ?, ?, ?, ?)", rows)
+            self._reply(204)
+
+        def log_message(self, format, *args):
+            pass
+
+    return CollectorHandler
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100.0 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(conn, doc=None) -> List[Dict[str, Any]]:
+    """Count and p50 / p90 / p99 / max duration per (doc, build, name)."""
+    query = "SELECT doc, build, name, duration FROM measures"
+    params = ()
+    if doc:
+        query += " WHERE doc = ?"
+        params = (doc,)
+    groups: Dict[tuple, List[float]] = {}
+    for doc_name, build, name, duration in conn.execute(query, params):
+        groups.setdefault((doc_name, build, name), []).append(duration)
+
+    summary = []
+    for (doc_name, build, name), durations in sorted(groups.items()):
+        durations.sort()
+        summary.append(
+            {
+                "doc": doc_name,
+                "build": build,
+                "name": name,
+                "count": len(durations),
+                "p50": percentile(durations, 50),
+                "p90": percentile(durations, 90),
+                "p99": percentile(durations, 99),
+                "max": durations[-1],
+            }
+        )
+    return summary
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Collect and summarize viewer performance telemetry."
+    )
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"SQLite file (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Accept beacons on POST /collect")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+
+    report = sub.add_parser("report", help="Print latency percentiles per doc/build/step")
+    report.add_argument("--doc", default=None, help="Only this document")
+    report.add_argument("--json", action="store_true", help="Output the summary as JSON")
+
+    args = parser.parse_args(argv)
+    conn = open_db(args.db)
+
+    if args.command == "serve":
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(conn))
+        print(f"✅ Collecting on http://{args.host}:{args.port}/collect into {args.db}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            conn.close()
+        return
+
+    summary = summarize(conn, doc=args.doc)
+    conn.close()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    if not summary:
+        print("No measures recorded yet.")
+        return
+
+    current = None
+    for row in summary:
+        if (row["doc"], row["build"]) != current:
+            current = (row["doc"], row["build"])
+            print(f"{row['doc']}  (build {row['build']})")
+        print(
+            "  %-18s n=%-5d p50 %8.1f ms  p90 %8.1f ms  p99 %8.1f ms  max %8.1f ms"
+            % (row["name"], row["count"], row["p50"], row["p90"], row["p99"], row["max"])
+        )
+
+
+if __name__ == "__main__":
+    main()
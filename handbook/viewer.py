@@ -0,0 +1,2050 @@
+#!/usr/bin/env python3
+"""
+Read headings.json (output from detect_headings.py --json)
+and generate a simple 'Teams-like' HTML page:
+
+- Left sidebar: chapters + subheading buttons
+- Right pane: shows details for the selected item
+
+Next to the HTML it also writes <name>.sw.js, a service worker scoped to
+that page which precaches it, pdf.js and the PDF(s) under a version
+derived from their content hashes. Each HTML gets its own worker and
+caches, so a library and a single-document viewer can share a folder.
+
+With --corpus, several headings.json files are combined into one library
+viewer: the page embeds a small manifest (titles, heading texts for search,
+page tables) and fetches each document's full JSON when it is opened.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from html import escape, unescape
+from pathlib import Path
+
+HTML_TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8" />
+  <title>Paediatric Pain Manual – Nav Preview</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  <style>
+    * {
+      box-sizing: border-box;
+    }
+
+    body {
+      margin: 0;
+      font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
+      display: flex;
+      height: 100vh;
+      color: #111827;
+    }
+
+    .sidebar {
+      position: relative;
+      width: 320px;
+      background: #f3f4f6;
+      border-right: 1px solid #e5e7eb;
+      padding: 12px;
+      overflow-y: auto;
+    }
+
+    .sidebar-header {
+      font-weight: 600;
+      margin-bottom: 8px;
+      font-size: 14px;
+      text-transform: uppercase;
+      letter-spacing: 0.04em;
+      color: #6b7280;
+    }
+
+    /* Sidebar rows are windowed: fixed height, absolutely positioned */
+    .sidebar-rows {
+      position: relative;
+    }
+
+    .sidebar-row {
+      position: absolute;
+      left: 0;
+      right: 0;
+      height: 30px;
+      display: flex;
+      align-items: center;
+      white-space: nowrap;
+      cursor: pointer;
+    }
+
+    .sidebar-row[hidden] {
+      display: none;
+    }
+
+    .sidebar-row .row-text {
+      flex: 1;
+      min-width: 0;
+      overflow: hidden;
+      text-overflow: ellipsis;
+    }
+
+    .chapter-title {
+      padding: 0 8px;
+      font-size: 14px;
+      font-weight: 600;
+    }
+
+    .chapter-title:hover {
+      color: #1d4ed8;
+    }
+
+    .sidebar-row .chevron {
+      font-size: 11px;
+      color: #9ca3af;
+      margin-left: 6px;
+    }
+
+    .subheading-btn {
+      margin-left: 12px;
+      padding: 0 6px;
+      border-left: 2px solid #e5e7eb;
+      border-radius: 0 6px 6px 0;
+      font-size: 13px;
+      color: #374151;
+    }
+
+    .subheading-btn:hover {
+      background: #e5e7eb;
+    }
+
+    .subheading-btn.selected {
+      background: #dbeafe;
+      color: #1d4ed8;
+      font-weight: 500;
+    }
+
+    .content {
+      flex: 1;
+      padding: 16px 20px;
+      overflow-y: auto;
+      background: #ffffff;
+    }
+
+    .content h1 {
+      margin-top: 0;
+      font-size: 22px;
+    }
+
+    .content .meta {
+      font-size: 13px;
+      color: #6b7280;
+      margin-bottom: 12px;
+    }
+
+    .pill {
+      display: inline-flex;
+      align-items: center;
+      padding: 2px 8px;
+      border-radius: 999px;
+      background: #eff6ff;
+      color: #1d4ed8;
+      font-size: 12px;
+      margin-right: 6px;
+    }
+
+    .placeholder-box {
+      margin-top: 16px;
+      padding: 16px;
+      border-radius: 12px;
+      border: 1px dashed #d1d5db;
+      background: #f9fafb;
+      font-size: 13px;
+      color: #4b5563;
+    }
+
+    .search-box {
+      margin-bottom: 8px;
+    }
+
+    .doc-select {
+      width: 100%;
+      margin-bottom: 8px;
+      padding: 6px 8px;
+      border-radius: 6px;
+      border: 1px solid #d1d5db;
+      background: #fff;
+      font-size: 13px;
+    }
+
+    .doc-title {
+      padding: 0 8px;
+      font-size: 12px;
+      font-weight: 600;
+      text-transform: uppercase;
+      letter-spacing: 0.04em;
+      color: #6b7280;
+    }
+
+    .search-input {
+      width: 100%;
+      padding: 6px 8px;
+      border-radius: 6px;
+      border: 1px solid #d1d5db;
+      font-size: 13px;
+    }
+
+    .search-input:focus {
+      outline: none;
+      border-color: #2563eb;
+      box-shadow: 0 0 0 1px #2563eb33;
+    }
+
+    .pdf-container {
+      margin-top: 16px;
+      border: 1px solid #e5e7eb;
+      border-radius: 12px;
+      background: #0f172a;
+      min-height: 420px;
+      display: flex;
+      align-items: center;
+      justify-content: center;
+      position: relative;
+      overflow: hidden;
+    }
+
+    .pdf-container canvas {
+      width: 100%;
+      height: auto;
+      display: block;
+      background: #1f2937;
+    }
+
+    .pdf-status {
+      position: absolute;
+      top: 12px;
+      left: 12px;
+      padding: 4px 10px;
+      border-radius: 999px;
+      background: rgba(15, 23, 42, 0.8);
+      color: #f8fafc;
+      font-size: 12px;
+    }
+
+    .pdf-container.error {
+      background: #fff;
+      color: #b91c1c;
+      border-color: #fecaca;
+      min-height: auto;
+      padding: 16px;
+      display: block;
+    }
+
+    .page-controls {
+      display: flex;
+      align-items: center;
+      justify-content: flex-end;
+      gap: 8px;
+      margin-top: 8px;
+    }
+
+    .page-btn {
+      border: 1px solid #d1d5db;
+      background: #fff;
+      border-radius: 6px;
+      padding: 4px 10px;
+      font-size: 13px;
+      cursor: pointer;
+      color: #1f2937;
+    }
+
+    .page-btn:hover:not(:disabled) {
+      border-color: #2563eb;
+      color: #1d4ed8;
+    }
+
+    .page-btn:disabled {
+      opacity: 0.4;
+      cursor: not-allowed;
+    }
+
+    .page-indicator {
+      font-size: 12px;
+      color: #6b7280;
+      font-weight: 500;
+    }
+
+    .find-box {
+      display: flex;
+      align-items: center;
+      gap: 4px;
+      margin-bottom: 8px;
+    }
+
+    .find-box[hidden] {
+      display: none;
+    }
+
+    .find-box .search-input {
+      flex: 1;
+      min-width: 0;
+    }
+
+    .find-status {
+      font-size: 12px;
+      color: #6b7280;
+      white-space: nowrap;
+    }
+
+    .page-frame {
+      position: relative;
+      width: 100%;
+    }
+
+    .find-layer {
+      position: absolute;
+      inset: 0;
+      pointer-events: none;
+    }
+
+    .find-hit {
+      position: absolute;
+      border-radius: 2px;
+      background: rgba(250, 204, 21, 0.4);
+    }
+
+    .find-hit.current {
+      background: rgba(249, 115, 22, 0.55);
+      outline: 1px solid #ea580c;
+    }
+
+    .mode-toggle {
+      display: flex;
+      align-items: center;
+      gap: 6px;
+      margin-bottom: 8px;
+      font-size: 13px;
+      color: #374151;
+      cursor: pointer;
+    }
+
+    .pdf-pages {
+      margin-top: 16px;
+      display: flex;
+      flex-direction: column;
+      gap: 12px;
+    }
+
+    .pdf-page {
+      position: relative;
+      width: 100%;
+      border-radius: 8px;
+      background: #1f2937;
+      overflow: hidden;
+    }
+
+    .pdf-page canvas {
+      width: 100%;
+      height: 100%;
+      display: block;
+    }
+
+    .section-text {
+      margin-top: 16px;
+      padding: 16px;
+      border: 1px solid #e5e7eb;
+      border-radius: 12px;
+      background: #fefefe;
+      font-size: 14px;
+      line-height: 1.6;
+    }
+
+    .section-text p {
+      margin: 8px 0;
+    }
+
+    .section-text ul {
+      margin: 12px 0;
+      padding-left: 20px;
+    }
+
+    .section-text table {
+      width: 100%;
+      border-collapse: collapse;
+      margin: 12px 0;
+      font-size: 13px;
+    }
+
+    .section-text td {
+      border: 1px solid #e5e7eb;
+      padding: 4px 6px;
+      vertical-align: top;
+    }
+
+    .section-text figure {
+      margin: 12px 0;
+    }
+
+    .section-text figure img {
+      max-width: 100%;
+      height: auto;
+    }
+
+    .section-text .text-muted {
+      color: #6b7280;
+      font-style: italic;
+    }
+  </style>
+</head>
+<body>
+  <div class="sidebar">
+    <div class="sidebar-header">Chapters & Sections</div>
+    <select id="docSelect" class="doc-select" hidden></select>
+    <div class="search-box">
+      <input id="searchInput" class="search-input" placeholder="Search headings..." />
+    </div>
+    <div id="findBox" class="find-box" hidden>
+      <input id="findInput" class="search-input" placeholder="Find in document..." />
+      <span id="findStatus" class="find-status"></span>
+      <button id="findPrev" class="page-btn" title="Previous match (Shift+Enter)">↑</button>
+      <button id="findNext" class="page-btn" title="Next match (Enter)">↓</button>
+    </div>
+    <label class="mode-toggle">
+      <input id="continuousToggle" type="checkbox" />
+      Continuous scroll
+    </label>
+    <div id="sidebarContent" class="sidebar-rows"></div>
+  </div>
+  <div class="content">
+    <h1>Paediatric Pain Manual – Navigation Preview</h1>
+    <p class="meta">
+      Click a subheading on the left to see details. In Teams, this is where you'd:
+      <span class="pill">Scroll PDF to page X</span>
+      <span class="pill">Highlight section</span>
+    </p>
+    <div class="placeholder-box">
+      <strong>No section selected yet.</strong><br/>
+      This pane is acting like your future Teams tab content area.<br/>
+      When you click a heading on the left, you'll see:
+      <ul>
+        <li>Heading text + parent chapter</li>
+        <li>The PDF page rendered via pdf.js</li>
+        <li>Quick metadata chips you can reuse in Teams</li>
+        <li>A short description of what the Teams app would do</li>
+      </ul>
+    </div>
+  </div>
+
+  <script id="headingData" type="application/json">__JSON_DATA__</script>
+  <script>
+    // Performance telemetry: User Timing measures for the expensive steps,
+    // batched and sent with sendBeacon to TELEMETRY_ENDPOINT (set at build
+    // time with --telemetry-endpoint; empty = only recorded in DevTools).
+    const TELEMETRY_ENDPOINT = __TELEMETRY_ENDPOINT__;
+    const BUILD_ID = __BUILD_ID__;
+    const SERVICE_WORKER_URL = __SERVICE_WORKER_URL__;
+    const SERVICE_WORKER_SCOPE = __SERVICE_WORKER_SCOPE__;
+    const TELEMETRY_BATCH = 20;
+    const telemetryQueue = [];
+    let telemetryDoc = document.title;  // the open document; set by loadDocumentData
+
+    function recordMeasure(name, start) {
+      const end = performance.now();
+      if (performance.measure) {
+        try {
+          performance.measure(name, { start, end });
+        } catch (err) {
+          // User Timing Level 2 browsers: the measure is still queued below
+        }
+      }
+      if (!TELEMETRY_ENDPOINT) return;
+      telemetryQueue.push({
+        name,
+        duration: Math.round((end - start) * 100) / 100,
+        doc: telemetryDoc,
+        at: Date.now(),
+      });
+      if (telemetryQueue.length >= TELEMETRY_BATCH) {
+        flushTelemetry();
+      }
+    }
+
+    function timed(name, fn) {
+      const start = performance.now();
+      try {
+        return fn();
+      } finally {
+        recordMeasure(name, start);
+      }
+    }
+
+    function flushTelemetry() {
+      if (!telemetryQueue.length || !navigator.sendBeacon) return;
+      const payload = JSON.stringify({ build: BUILD_ID, measures: telemetryQueue.splice(0) });
+      // text/plain keeps the beacon a "simple" request (no CORS preflight)
+      navigator.sendBeacon(TELEMETRY_ENDPOINT, new Blob([payload], { type: 'text/plain' }));
+    }
+
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'hidden') flushTelemetry();
+    });
+
+    // Either the tree + metadata from detect_headings.py --json, or (for a
+    // library built with --corpus) a manifest: { corpus: [{ title, data,
+    // pdf, page_sections, headings: [[id, text], ...] }, ...] }
+    const pageData = timed('parseHeadingData', () =>
+      JSON.parse(document.getElementById('headingData').textContent)
+    );
+    const corpus = !Array.isArray(pageData) && Array.isArray(pageData.corpus) ? pageData.corpus : null;
+
+    // State of the document on screen; see loadDocumentData()
+    let headingData = null;
+    let headingsTree = [];
+    let pdfSource = '';
+    let pageSections = [];
+    let pageSizes = [];
+    let allChapters = [];
+    let wordLayer = null;  // { url, pages } from detect_headings.py --words
+    let imageUrls = null;  // library only: <img src> as written -> rebased src
+    let currentDoc = -1;
+
+    const sidebar = document.querySelector('.sidebar');
+    const sidebarContent = document.getElementById('sidebarContent');
+    const content = document.querySelector('.content');
+    const searchInput = document.getElementById('searchInput');
+    const docSelect = document.getElementById('docSelect');
+    const findBox = document.getElementById('findBox');
+    const findInput = document.getElementById('findInput');
+    const findStatus = document.getElementById('findStatus');
+
+    // page_sections[P - 1] = id of the heading shown for page P (built by
+    // build_headings_html.py), so paging can re-sync the sidebar in O(1).
+    const sectionTargets = new Map();  // heading id -> { node, chapter }
+    const nodesById = new Map();       // heading id -> node
+
+    // Library pages rebase image URLs from the document's folder to their own
+    function sectionBodyHtml(section) {
+      const html = section.content_html;
+      if (!html || !imageUrls) return html;
+      return html.replace(/<img src="([^"]*)"/g, (match, src) =>
+        src in imageUrls ? `<img src="${imageUrls[src]}"` : match);
+    }
+
+    function loadDocumentData(data, corpusEntry) {
+      headingData = data;
+      headingsTree = Array.isArray(data) ? data : (data.headings || []);
+      pdfSource = corpusEntry && corpusEntry.pdf
+        ? corpusEntry.pdf
+        : Array.isArray(data)
+          ? ''
+          : (
+              data.pdf_path ||
+              data.pdf ||
+              data.pdf_filename ||
+              data.pdfPath ||
+              ''
+            );
+      pageSections = (corpusEntry && corpusEntry.page_sections) ||
+        (Array.isArray(data) ? [] : (data.page_sections || []));
+      pageSizes = Array.isArray(data) ? [] : (data.page_sizes || []);
+      const layer = Array.isArray(data) ? null : data.word_layer;
+      wordLayer = layer && layer.url
+        ? { url: (corpusEntry && corpusEntry.words) || layer.url, pages: layer.pages }
+        : null;
+      telemetryDoc = (corpusEntry && corpusEntry.title) || pdfSource || document.title;
+      imageUrls = (corpusEntry && corpusEntry.images) || null;
+
+      sectionTargets.clear();
+      nodesById.clear();
+      indexSections(headingsTree);
+      allChapters = collectChapters(headingsTree);
+      resetFind();
+    }
+
+    function indexSections(tree) {
+      function walk(nodes, chapter) {
+        nodes.forEach(node => {
+          const owner = node.level === 2 ? node : chapter;
+          nodesById.set(node.id, node);
+          if (owner) {
+            sectionTargets.set(node.id, { node, chapter: owner });
+          }
+          if (node.children && node.children.length) {
+            walk(node.children, owner);
+          }
+        });
+      }
+      walk(tree, null);
+    }
+
+    function sectionForPage(pageNumber) {
+      if (!pageSections.length) return null;
+      const idx = Math.min(pageNumber, pageSections.length) - 1;
+      const id = pageSections[idx];
+      if (id === null || id === undefined) return null;
+      return sectionTargets.get(id) || null;
+    }
+
+    function collectChapters(tree) {
+      const chapters = [];
+      function walk(nodes) {
+        nodes.forEach(node => {
+          if (node.level === 2) {
+            chapters.push(node);
+          }
+          if (node.children && node.children.length) {
+            walk(node.children);
+          }
+        });
+      }
+      walk(tree);
+      return chapters;
+    }
+
+    function filterNodesBySearch(term, chapters) {
+      if (!term) return chapters;
+      term = term.toLowerCase();
+      return chapters.map(ch => {
+        const matchChapter = ch.text.toLowerCase().includes(term);
+        const filteredChildren = (ch.children || []).filter(child =>
+          child.text.toLowerCase().includes(term)
+        );
+        if (matchChapter || filteredChildren.length) {
+          return Object.assign({}, ch, { children: filteredChildren.length ? filteredChildren : ch.children });
+        }
+        return null;
+      }).filter(Boolean);
+    }
+
+    // The sidebar is a windowed list: the expanded tree is flattened into
+    // fixed-height rows and only the rows in view (plus a few) are in the DOM.
+    const ROW_HEIGHT = 30;    // keep in sync with .sidebar-row height
+    const ROW_OVERSCAN = 6;
+    const ROW_CLASSES = { chapter: 'chapter-title', sub: 'subheading-btn', doc: 'doc-title', hit: 'subheading-btn' };
+    const expandedChapters = new Set();
+    const rowIndexById = new Map();  // heading id -> index in sidebarRows
+    const rowPool = [];
+    let sidebarChapters = [];
+    let sidebarHits = [];            // matches in other corpus documents
+    let sidebarRows = [];            // { kind: chapter|sub|doc|hit, node, chapter, docIndex }
+    let selectedId = null;
+    let windowFrame = 0;
+
+    function flattenSidebar() {
+      sidebarRows = [];
+      rowIndexById.clear();
+      sidebarChapters.forEach(chapter => {
+        rowIndexById.set(chapter.id, sidebarRows.length);
+        sidebarRows.push({ kind: 'chapter', node: chapter, chapter });
+        if (expandedChapters.has(chapter.id)) {
+          (chapter.children || []).forEach(child => {
+            rowIndexById.set(child.id, sidebarRows.length);
+            sidebarRows.push({ kind: 'sub', node: child, chapter });
+          });
+        }
+      });
+      sidebarHits.forEach(group => {
+        sidebarRows.push({ kind: 'doc', node: { text: group.title }, docIndex: group.docIndex });
+        group.hits.forEach(([id, text]) => {
+          sidebarRows.push({ kind: 'hit', node: { id, text }, docIndex: group.docIndex });
+        });
+      });
+      sidebarContent.style.height = (sidebarRows.length * ROW_HEIGHT) + 'px';
+    }
+
+    function renderSidebarWindow() {
+      windowFrame = 0;
+      const viewTop = sidebar.scrollTop - sidebarContent.offsetTop;
+      const first = Math.max(0, Math.floor(viewTop / ROW_HEIGHT) - ROW_OVERSCAN);
+      const last = Math.min(
+        sidebarRows.length,
+        Math.ceil((viewTop + sidebar.clientHeight) / ROW_HEIGHT) + ROW_OVERSCAN
+      );
+
+      let used = 0;
+      for (let i = first; i < last; i++) {
+        let el = rowPool[used];
+        if (!el) {
+          el = document.createElement('div');
+          el.innerHTML = '<span class="row-text"></span><span class="chevron"></span>';
+          sidebarContent.appendChild(el);
+          rowPool.push(el);
+        }
+        used++;
+
+        const row = sidebarRows[i];
+        const hasChildren = row.kind === 'chapter' && row.node.children && row.node.children.length > 0;
+        el.className = 'sidebar-row ' + ROW_CLASSES[row.kind];
+        if (row.kind === 'sub' && row.node.id === selectedId) {
+          el.classList.add('selected');
+        }
+        el.dataset.index = String(i);
+        el.style.top = (i * ROW_HEIGHT) + 'px';
+        el.title = row.node.text;
+        el.firstChild.textContent = row.node.text;
+        // With children -> collapsed by default (▸); without -> no chevron
+        el.lastChild.textContent = hasChildren ? (expandedChapters.has(row.node.id) ? '▾' : '▸') : '';
+        el.hidden = false;
+      }
+      for (let k = used; k < rowPool.length; k++) {
+        rowPool[k].hidden = true;
+      }
+    }
+
+    function scheduleSidebarWindow() {
+      if (!windowFrame) {
+        windowFrame = requestAnimationFrame(renderSidebarWindow);
+      }
+    }
+
+    function renderSidebar(chapters, corpusHits) {
+      const start = performance.now();
+      sidebarChapters = chapters;
+      sidebarHits = corpusHits || [];
+      expandedChapters.clear();
+      flattenSidebar();
+      renderSidebarWindow();
+      recordMeasure('renderSidebar', start);
+    }
+
+    function scrollRowIntoView(index) {
+      const rowTop = sidebarContent.offsetTop + index * ROW_HEIGHT;
+      if (rowTop < sidebar.scrollTop) {
+        sidebar.scrollTop = rowTop;
+      } else if (rowTop + ROW_HEIGHT > sidebar.scrollTop + sidebar.clientHeight) {
+        sidebar.scrollTop = rowTop + ROW_HEIGHT - sidebar.clientHeight;
+      }
+    }
+
+    // One delegated listener serves every row, however many headings exist
+    sidebarContent.addEventListener('click', (e) => {
+      const rowEl = e.target.closest('.sidebar-row');
+      const row = rowEl ? sidebarRows[Number(rowEl.dataset.index)] : null;
+      if (!row) return;
+
+      if (row.kind === 'doc') {
+        openDocument(row.docIndex);
+      } else if (row.kind === 'hit') {
+        openDocument(row.docIndex, row.node.id);
+      } else if (row.kind === 'chapter') {
+        if (row.node.children && row.node.children.length) {
+          if (expandedChapters.has(row.node.id)) {
+            expandedChapters.delete(row.node.id);
+          } else {
+            expandedChapters.add(row.node.id);
+          }
+          flattenSidebar();
+          renderSidebarWindow();
+        }
+        // Show this chapter in the main pane
+        showHeading(row.node, row.node);
+      } else {
+        selectedId = row.node.id;
+        renderSidebarWindow();
+        showHeading(row.node, row.chapter);
+      }
+    });
+
+    sidebar.addEventListener('scroll', scheduleSidebarWindow, { passive: true });
+    window.addEventListener('resize', scheduleSidebarWindow);
+
+    // Open pdf.js documents in least-recently-used order. They all share one
+    // worker, so switching back to a pooled document needs no reload, and
+    // evicted documents are destroyed to release their memory.
+    const PDF_POOL_LIMIT = 3;
+    const pdfPool = new Map();  // url -> pdf.js loading task
+    let sharedPdfWorker = null;
+
+    function acquirePdf(url) {
+      let task = pdfPool.get(url);
+      if (task) {
+        pdfPool.delete(url);
+        pdfPool.set(url, task);
+        return task.promise;
+      }
+
+      if (!sharedPdfWorker) {
+        sharedPdfWorker = new window.pdfjsLib.PDFWorker();
+      }
+      task = window.pdfjsLib.getDocument({ url, worker: sharedPdfWorker });
+      task.promise.catch(() => {
+        if (pdfPool.get(url) === task) pdfPool.delete(url);
+      });
+      pdfPool.set(url, task);
+
+      while (pdfPool.size > PDF_POOL_LIMIT) {
+        const [oldUrl, oldTask] = pdfPool.entries().next().value;
+        pdfPool.delete(oldUrl);
+        oldTask.destroy();
+      }
+      return task.promise;
+    }
+
+    // pdf.js is injected on first use (or by the idle prewarm below) rather
+    // than by a blocking <script>, so it never delays the sidebar's first paint.
+    let pdfJsPromise = null;
+
+    function loadPdfJs() {
+      if (!pdfJsPromise) {
+        pdfJsPromise = new Promise((resolve, reject) => {
+          const script = document.createElement('script');
+          script.src = 'vendor/pdfjs/pdf.min.js';
+          script.onload = () => {
+            const pdfjsBuild = window['pdfjs-dist/build/pdf'];
+            if (pdfjsBuild && pdfjsBuild.GlobalWorkerOptions) {
+              pdfjsBuild.GlobalWorkerOptions.workerSrc = 'vendor/pdfjs/pdf.worker.min.js';
+              window.pdfjsLib = pdfjsBuild;
+              resolve(pdfjsBuild);
+            } else {
+              reject(new Error('pdf.js failed to initialize'));
+            }
+          };
+          script.onerror = () => reject(new Error('pdf.js failed to load'));
+          document.head.appendChild(script);
+        });
+        pdfJsPromise.catch(() => {
+          pdfJsPromise = null;  // allow a retry on the next click
+        });
+      }
+      return pdfJsPromise;
+    }
+
+    async function ensurePdfLoaded() {
+      if (!pdfSource) {
+        throw new Error("No PDF path defined in headings.json");
+      }
+      const source = pdfSource;
+      if (pdfPool.has(source)) {
+        return acquirePdf(source);
+      }
+      // Cold path only: pooled documents would just dilute the numbers
+      const start = performance.now();
+      await loadPdfJs();
+      const pdf = await acquirePdf(source);
+      recordMeasure('ensurePdfLoaded', start);
+      return pdf;
+    }
+
+    // Idle-time prewarm: once the sidebar is up, start the pdf.js worker,
+    // load the document and render the first chapter's page off-screen, so
+    // the first click only has to copy pixels.
+    const whenIdle = window.requestIdleCallback
+      ? fn => window.requestIdleCallback(fn, { timeout: 2000 })
+      : fn => setTimeout(fn, 200);
+    let prerenderedPage = null;  // { source, pageNumber, canvas }
+
+    function prewarmDocument() {
+      const source = pdfSource;
+      const first = allChapters[0] || headingsTree[0];
+      if (!source || !first) return;
+
+      whenIdle(async () => {
+        if (source !== pdfSource) return;
+        try {
+          const pdf = await ensurePdfLoaded();
+          const page = await pdf.getPage(first.page);
+          if (source !== pdfSource) return;
+          const canvas = document.createElement('canvas');
+          const viewport = page.getViewport({ scale: 1.2 });
+          canvas.width = viewport.width;
+          canvas.height = viewport.height;
+          await page.render({ canvasContext: canvas.getContext('2d'), viewport }).promise;
+          if (source === pdfSource) {
+            prerenderedPage = { source, pageNumber: first.page, canvas };
+          }
+        } catch (err) {
+          console.warn('pdf.js prewarm failed', err);
+        }
+      });
+    }
+
+    async function renderPdfPage(pageNumber, canvas) {
+      const start = performance.now();
+      const pre = prerenderedPage;
+      if (pre && pre.source === pdfSource && pre.pageNumber === pageNumber) {
+        canvas.width = pre.canvas.width;
+        canvas.height = pre.canvas.height;
+        canvas.getContext('2d').drawImage(pre.canvas, 0, 0);
+        recordMeasure('renderPdfPage', start);
+        return;
+      }
+
+      const pdf = await ensurePdfLoaded();
+      const page = await pdf.getPage(pageNumber);
+      const viewport = page.getViewport({ scale: 1.2 });
+      const ctx = canvas.getContext('2d');
+      canvas.width = viewport.width;
+      canvas.height = viewport.height;
+      await page.render({ canvasContext: ctx, viewport }).promise;
+      recordMeasure('renderPdfPage', start);
+    }
+
+    function highlightSection(node, chapter) {
+      selectedId = null;
+      if (node.id !== chapter.id && rowIndexById.has(chapter.id)) {
+        if (!expandedChapters.has(chapter.id)) {
+          expandedChapters.add(chapter.id);
+          flattenSidebar();
+        }
+        if (rowIndexById.has(node.id)) {
+          selectedId = node.id;
+          scrollRowIntoView(rowIndexById.get(node.id));
+        }
+      }
+      renderSidebarWindow();
+    }
+
+    function createSectionHeader() {
+      const h1 = document.createElement('h1');
+      const meta = document.createElement('p');
+      meta.className = 'meta';
+
+      const pills = document.createElement('div');
+      const pillChapter = document.createElement('span');
+      pillChapter.className = 'pill';
+      const pillPage = document.createElement('span');
+      pillPage.className = 'pill';
+      const pillLevel = document.createElement('span');
+      pillLevel.className = 'pill';
+
+      pills.appendChild(pillChapter);
+      pills.appendChild(pillPage);
+      pills.appendChild(pillLevel);
+
+      function describe(section, sectionChapter) {
+        h1.textContent = section.text;
+        meta.textContent = `Part of "${sectionChapter.text}" • Page ${section.page} • Level L${section.level}`;
+        pillChapter.textContent = 'Chapter: ' + sectionChapter.text;
+        pillPage.textContent = 'Page: ' + section.page;
+        pillLevel.textContent = 'Level: L' + section.level;
+      }
+
+      return { elements: [h1, meta, pills], describe };
+    }
+
+    // Continuous-scroll mode: one placeholder per page, sized from
+    // page_sizes, with only pages near the viewport holding a canvas.
+    const CONTINUOUS_SCALE = 1.2;
+    const CONTINUOUS_MARGIN = '800px 0px';  // render this far beyond the viewport
+    const CANVAS_POOL_LIMIT = 4;            // spare canvases kept for reuse
+    const continuousToggle = document.getElementById('continuousToggle');
+    const initialContentHtml = content.innerHTML;
+    let continuousViewPromise = null;
+    let lastShown = null;
+
+    async function buildContinuousView() {
+      const pdf = await ensurePdfLoaded();
+      const totalPages = pdf.numPages;
+
+      // Pages missing from page_sizes fall back to page 1's dimensions;
+      // the real aspect ratio is applied once the page renders.
+      let fallbackSize = null;
+      if (pageSizes.length < totalPages) {
+        const firstViewport = (await pdf.getPage(1)).getViewport({ scale: 1 });
+        fallbackSize = [firstViewport.width, firstViewport.height];
+      }
+
+      const root = document.createElement('div');
+      root.className = 'pdf-pages';
+      const slots = [];
+      const canvasPool = [];
+
+      function releaseCanvas(canvas) {
+        if (canvasPool.length < CANVAS_POOL_LIMIT) {
+          canvasPool.push(canvas);
+        } else {
+          // Zero-size canvases give their backing store back immediately
+          canvas.width = 0;
+          canvas.height = 0;
+        }
+      }
+
+      async function renderSlot(slot) {
+        const canvas = canvasPool.pop() || document.createElement('canvas');
+        slot.canvas = canvas;
+        slot.el.appendChild(canvas);
+        try {
+          const page = await pdf.getPage(slot.pageNumber);
+          if (slot.canvas !== canvas) return;  // scrolled away while loading
+          const viewport = page.getViewport({ scale: CONTINUOUS_SCALE });
+          canvas.width = viewport.width;
+          canvas.height = viewport.height;
+          slot.el.style.aspectRatio = `${viewport.width} / ${viewport.height}`;
+          slot.page = page;
+          slot.task = page.render({ canvasContext: canvas.getContext('2d'), viewport });
+          await slot.task.promise;
+        } catch (err) {
+          if (!err || err.name !== 'RenderingCancelledException') {
+            console.error(err);
+          }
+        } finally {
+          if (slot.canvas === canvas) {
+            slot.task = null;
+          }
+        }
+      }
+
+      function releaseSlot(slot) {
+        const canvas = slot.canvas;
+        if (!canvas) return;
+        const task = slot.task;
+        const page = slot.page;
+        slot.canvas = null;
+        slot.task = null;
+        slot.page = null;
+        canvas.remove();
+        if (task) {
+          // Only recycle the canvas once the cancelled render has stopped drawing
+          task.cancel();
+          task.promise.catch(() => {}).then(() => {
+            releaseCanvas(canvas);
+            page.cleanup();
+          });
+        } else {
+          releaseCanvas(canvas);
+          if (page) page.cleanup();
+        }
+      }
+
+      const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+          const slot = slots[Number(entry.target.dataset.index)];
+          if (entry.isIntersecting) {
+            if (!slot.canvas) renderSlot(slot);
+          } else {
+            releaseSlot(slot);
+          }
+        });
+      }, { root: content, rootMargin: CONTINUOUS_MARGIN });
+
+      for (let i = 0; i < totalPages; i++) {
+        const size = pageSizes[i] || fallbackSize;
+        const el = document.createElement('div');
+        el.className = 'pdf-page';
+        el.dataset.index = String(i);
+        el.style.aspectRatio = `${size[0]} / ${size[1]}`;
+        el.appendChild(createFindLayer(i + 1));
+        root.appendChild(el);
+        slots.push({ el, pageNumber: i + 1, size, canvas: null, task: null, page: null });
+      }
+      slots.forEach(slot => observer.observe(slot.el));
+
+      function scrollToPosition(pageNumber, top) {
+        const slot = slots[Math.min(Math.max(pageNumber, 1), slots.length) - 1];
+        const fraction = top ? Math.min(top / slot.size[1], 1) : 0;
+        const offset = slot.el.getBoundingClientRect().top - content.getBoundingClientRect().top;
+        content.scrollTop += offset + fraction * slot.el.clientHeight;
+      }
+
+      function destroy() {
+        observer.disconnect();
+        slots.forEach(releaseSlot);
+        canvasPool.length = 0;
+        root.remove();
+      }
+
+      return { root, scrollToPosition, destroy };
+    }
+
+    function showHeadingContinuous(node, chapter, position) {
+      if (!continuousViewPromise) {
+        content.innerHTML = "";
+        const header = createSectionHeader();
+        header.elements.forEach(el => content.appendChild(el));
+        const pdfStatus = document.createElement('div');
+        pdfStatus.className = 'meta';
+        pdfStatus.textContent = 'Loading document…';
+        content.appendChild(pdfStatus);
+
+        continuousViewPromise = buildContinuousView().then(view => {
+          pdfStatus.remove();
+          content.appendChild(view.root);
+          return Object.assign({ header }, view);
+        }, err => {
+          console.error(err);
+          pdfStatus.textContent = 'Unable to load PDF. Check console for details.';
+          continuousViewPromise = null;
+          return null;
+        });
+      }
+
+      const viewPromise = continuousViewPromise;
+      return viewPromise.then(view => {
+        if (!view || viewPromise !== continuousViewPromise) return;
+        if (node) {
+          view.header.describe(node, chapter);
+        }
+        if (position) {
+          view.scrollToPosition(position.page, Math.max(position.top - POSITION_MARGIN, 0));
+        } else if (node) {
+          view.scrollToPosition(node.page, node.top);
+        }
+      });
+    }
+
+    function closeContinuousView() {
+      if (!continuousViewPromise) return;
+      continuousViewPromise.then(view => {
+        if (view) view.destroy();
+      });
+      continuousViewPromise = null;
+    }
+
+    // Scroll the content pane so `top` (pdf units) on the page shown in
+    // `frame` is in view, unless it already is.
+    function revealPosition(frame, pageNumber, top) {
+      const size = pageSizes[pageNumber - 1];
+      if (!size || !frame.clientHeight) return;
+      const frameTop = frame.getBoundingClientRect().top - content.getBoundingClientRect().top;
+      const y = content.scrollTop + frameTop + (top / size[1]) * frame.clientHeight;
+      if (y < content.scrollTop || y > content.scrollTop + content.clientHeight * 0.8) {
+        content.scrollTop = Math.max(y - content.clientHeight / 3, 0);
+      }
+    }
+
+    let singlePageView = null;  // { frame, goToPosition(page, top, section) } on screen
+
+    // `position` ({ page, top }) shows that spot instead of the heading's own
+    async function showHeading(node, chapter, position) {
+      lastShown = { node, chapter };
+      if (continuousToggle.checked && pdfSource) {
+        return showHeadingContinuous(node, chapter, position);
+      }
+
+      content.innerHTML = "";
+
+      const header = createSectionHeader();
+      const textDump = document.createElement('div');
+      textDump.className = 'section-text';
+
+      function describeSection(section, sectionChapter) {
+        header.describe(section, sectionChapter);
+        textDump.innerHTML = sectionBodyHtml(section) || '<p class="text-muted">No extracted text for this section yet.</p>';
+      }
+      describeSection(node, chapter);
+
+      header.elements.forEach(el => content.appendChild(el));
+
+      const pdfWrapper = document.createElement('div');
+      pdfWrapper.className = 'pdf-container';
+
+      const pdfStatus = document.createElement('div');
+      pdfStatus.className = 'pdf-status';
+      pdfWrapper.appendChild(pdfStatus);
+
+      content.appendChild(pdfWrapper);
+
+      if (!pdfSource) {
+        pdfStatus.textContent = 'Add "pdf" to headings.json to preview the file here.';
+        pdfWrapper.classList.add('error');
+        content.appendChild(textDump);
+        return;
+      }
+
+      pdfStatus.textContent = `Loading page ${node.page}…`;
+
+      const pageFrame = document.createElement('div');
+      pageFrame.className = 'page-frame';
+      const canvas = document.createElement('canvas');
+      canvas.className = 'pdf-canvas';
+      const findLayer = createFindLayer(0);
+      pageFrame.appendChild(canvas);
+      pageFrame.appendChild(findLayer);
+      pdfWrapper.appendChild(pageFrame);
+
+      const controls = document.createElement('div');
+      controls.className = 'page-controls';
+      const prevBtn = document.createElement('button');
+      prevBtn.className = 'page-btn';
+      prevBtn.textContent = '← Prev page';
+      const pageIndicator = document.createElement('span');
+      pageIndicator.className = 'page-indicator';
+      const nextBtn = document.createElement('button');
+      nextBtn.className = 'page-btn';
+      nextBtn.textContent = 'Next page →';
+      controls.appendChild(prevBtn);
+      controls.appendChild(pageIndicator);
+      controls.appendChild(nextBtn);
+      content.appendChild(controls);
+
+      const pdfDoc = await ensurePdfLoaded();
+      const totalPages = pdfDoc.numPages;
+      let activePage = position ? position.page : node.page;
+      let isRendering = false;
+
+      function updateControls() {
+        prevBtn.disabled = activePage <= 1;
+        nextBtn.disabled = activePage >= totalPages;
+        pageIndicator.textContent = `Page ${activePage} / ${totalPages}`;
+      }
+
+      // A page turn shows the first section on the new page unless the
+      // caller (find) already knows which section the target belongs to
+      async function goToPage(targetPage, { syncSection = true } = {}) {
+        if (targetPage < 1 || targetPage > totalPages || isRendering) {
+          return;
+        }
+        isRendering = true;
+        const turned = targetPage !== activePage;
+        pdfStatus.textContent = `Loading page ${targetPage}…`;
+        try {
+          await renderPdfPage(targetPage, canvas);
+          activePage = targetPage;
+          pdfStatus.textContent = `Showing page ${targetPage}`;
+          findLayer.dataset.page = String(targetPage);
+          paintFindLayer(findLayer);
+          if (turned && syncSection) {
+            const target = sectionForPage(targetPage);
+            if (target) {
+              describeSection(target.node, target.chapter);
+              highlightSection(target.node, target.chapter);
+            }
+          }
+        } catch (err) {
+          console.error(err);
+          pdfWrapper.classList.add('error');
+          pdfStatus.textContent = 'Unable to load PDF page. Check console for details.';
+        } finally {
+          isRendering = false;
+          updateControls();
+        }
+      }
+
+      prevBtn.addEventListener('click', () => goToPage(activePage - 1));
+      nextBtn.addEventListener('click', () => goToPage(activePage + 1));
+
+      await goToPage(activePage);
+
+      content.appendChild(textDump);
+      revealPosition(pageFrame, activePage, position ? position.top - POSITION_MARGIN : node.top);
+
+      singlePageView = {
+        frame: pageFrame,
+        async goToPosition(pageNumber, top, section) {
+          await goToPage(pageNumber, { syncSection: !section });
+          if (section) describeSection(section.node, section.chapter);
+          revealPosition(pageFrame, pageNumber, top - POSITION_MARGIN);
+        },
+      };
+    }
+
+    // Find in document. Word boxes come from per-page shards written by
+    // detect_headings.py --words. The layer's word index narrows a query to
+    // the pages holding all its words, so only their shards are fetched.
+    const WORD_SHARD_LIMIT = 48;   // decoded pages kept in memory
+    const POSITION_MARGIN = 48;    // pdf units shown above a jump target
+    const wordShards = new Map();  // shard url -> Promise<decoded page>
+    let findIndex = null;          // { order, vocabulary, lastPage } once loaded
+    let findIndexLoad = null;      // Promise of findIndex for the open document
+    let findState = { query: '', hits: [], byPage: new Map(), index: -1 };
+    let findRun = 0;
+
+    function normalizeFindText(text) {
+      return text.toLowerCase().replace(/\s+/g, ' ').trim();
+    }
+
+    function decodeWordShard(shard) {
+      const quant = shard.quant;
+      const boxes = shard.boxes;
+      const words = [];
+      const starts = [];
+      const parts = [];
+      let x0 = 0;
+      let top = 0;
+      let offset = 0;
+      shard.words.forEach((text, i) => {
+        x0 += boxes[4 * i];
+        top += boxes[4 * i + 1];
+        words.push({
+          x0: x0 / quant,
+          x1: (x0 + boxes[4 * i + 2]) / quant,
+          top: top / quant,
+          bottom: (top + boxes[4 * i + 3]) / quant,
+          length: text.length,
+        });
+        starts.push(offset);
+        parts.push(text.toLowerCase());
+        offset += text.length + 1;
+      });
+      return { size: shard.size, words, starts, text: parts.join(' ') };
+    }
+
+    function loadWordShard(pageNumber) {
+      const url = `${wordLayer.url}/${pageNumber}.json`;
+      let promise = wordShards.get(url);
+      if (promise) {
+        wordShards.delete(url);  // re-inserted below as most recently used
+      } else {
+        promise = fetch(url).then(response => {
+          if (!response.ok) {
+            throw new Error(`Failed to load ${url}: ${response.status}`);
+          }
+          return response.json();
+        }).then(decodeWordShard);
+        promise.catch(() => wordShards.delete(url));
+      }
+      wordShards.set(url, promise);
+      while (wordShards.size > WORD_SHARD_LIMIT) {
+        wordShards.delete(wordShards.keys().next().value);
+      }
+      return promise;
+    }
+
+    // Pages of every word in the word layer (index.json next to the
+    // shards), so a query only fetches shards of pages holding all its
+    // words. Headings are only used to name the section of a hit.
+    async function loadFindIndex() {
+      const order = Array.from(nodesById.values())
+        .sort((a, b) => a.page - b.page || a.top - b.top);
+      const lastPage = wordLayer.pages || (order.length ? order[order.length - 1].page : 0);
+      let vocabulary = null;  // lowercased word -> Set of pages
+      try {
+        const response = await fetch(`${wordLayer.url}/index.json`);
+        if (!response.ok) {
+          throw new Error(`Failed to load the find index: ${response.status}`);
+        }
+        const index = await response.json();
+        vocabulary = new Map();
+        index.words.forEach((text, i) => {
+          const key = text.toLowerCase();
+          let pages = vocabulary.get(key);
+          if (!pages) vocabulary.set(key, pages = new Set());
+          let page = 0;
+          index.postings[i].forEach(delta => pages.add(page += delta));
+        });
+      } catch (err) {
+        // Word layers written before index.json: search every page
+        console.warn(err);
+      }
+      return { order, vocabulary, lastPage };
+    }
+
+    // A hit is a substring of the page's words joined by single spaces, so
+    // its inner tokens are whole words, the first ends a word and the last
+    // starts one; a single token lies anywhere inside a word.
+    function candidatePages(query) {
+      const { vocabulary, lastPage } = findIndex;
+      if (!vocabulary) {
+        return Array.from({ length: lastPage }, (_, i) => i + 1);
+      }
+      const tokens = query.split(' ');
+      let pages = null;
+      tokens.forEach((token, i) => {
+        const matching = new Set();
+        const addPages = wordPages => wordPages.forEach(page => matching.add(page));
+        let test = null;
+        if (tokens.length === 1) test = word => word.includes(token);
+        else if (i === 0) test = word => word.endsWith(token);
+        else if (i === tokens.length - 1) test = word => word.startsWith(token);
+        if (test) {
+          vocabulary.forEach((wordPages, word) => {
+            if (test(word)) addPages(wordPages);
+          });
+        } else if (vocabulary.has(token)) {
+          addPages(vocabulary.get(token));
+        }
+        pages = pages ? new Set([...pages].filter(page => matching.has(page))) : matching;
+      });
+      return Array.from(pages).sort((a, b) => a - b);
+    }
+
+    function sectionAt(pageNumber, top) {
+      const order = findIndex.order;
+      let lo = 0;
+      let hi = order.length;
+      while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        const node = order[mid];
+        if (node.page < pageNumber || (node.page === pageNumber && node.top <= top)) {
+          lo = mid + 1;
+        } else {
+          hi = mid;
+        }
+      }
+      const node = order[Math.max(lo - 1, 0)];
+      if (!node) return null;
+      return sectionTargets.get(node.id) || { node, chapter: node };
+    }
+
+    // Matches of `query` on one decoded page, as line-merged boxes
+    function findOnPage(shard, pageNumber, query) {
+      const hits = [];
+      let from = 0;
+      let at;
+      while ((at = shard.text.indexOf(query, from)) !== -1) {
+        const end = at + query.length;
+        let lo = 0;
+        let hi = shard.starts.length;
+        while (lo < hi) {
+          const mid = (lo + hi) >> 1;
+          if (shard.starts[mid] <= at) lo = mid + 1; else hi = mid;
+        }
+        const rects = [];
+        for (let i = Math.max(lo - 1, 0); i < shard.words.length && shard.starts[i] < end; i++) {
+          const word = shard.words[i];
+          const wordStart = shard.starts[i];
+          const width = word.x1 - word.x0;
+          // Partial words are trimmed by their share of the characters
+          const x0 = word.x0 + width * Math.max(at - wordStart, 0) / word.length;
+          const x1 = word.x0 + width * Math.min(end - wordStart, word.length) / word.length;
+          const last = rects[rects.length - 1];
+          if (last && Math.abs(last.top - word.top) < 1) {
+            last.x1 = Math.max(last.x1, x1);
+            last.bottom = Math.max(last.bottom, word.bottom);
+          } else {
+            rects.push({ x0, x1, top: word.top, bottom: word.bottom });
+          }
+        }
+        if (rects.length) {
+          hits.push({ page: pageNumber, top: rects[0].top, rects, size: shard.size });
+        }
+        from = end;
+      }
+      return hits;
+    }
+
+    function createFindLayer(pageNumber) {
+      const layer = document.createElement('div');
+      layer.className = 'find-layer';
+      layer.dataset.page = String(pageNumber);
+      paintFindLayer(layer);
+      return layer;
+    }
+
+    function paintFindLayer(layer) {
+      layer.textContent = '';
+      const indices = findState.byPage.get(Number(layer.dataset.page));
+      if (!indices) return;
+      indices.forEach(index => {
+        const hit = findState.hits[index];
+        const [width, height] = hit.size;
+        hit.rects.forEach(rect => {
+          const el = document.createElement('div');
+          el.className = index === findState.index ? 'find-hit current' : 'find-hit';
+          el.style.left = `${(rect.x0 / width) * 100}%`;
+          el.style.top = `${(rect.top / height) * 100}%`;
+          el.style.width = `${((rect.x1 - rect.x0) / width) * 100}%`;
+          el.style.height = `${((rect.bottom - rect.top) / height) * 100}%`;
+          layer.appendChild(el);
+        });
+      });
+    }
+
+    function repaintFindLayers() {
+      content.querySelectorAll('.find-layer').forEach(paintFindLayer);
+    }
+
+    function updateFindStatus() {
+      const { query, hits, index } = findState;
+      if (!query) {
+        findStatus.textContent = '';
+      } else if (!hits.length) {
+        findStatus.textContent = 'No matches';
+      } else {
+        findStatus.textContent = `${index + 1} / ${hits.length}`;
+      }
+    }
+
+    function setFindHits(query, hits) {
+      const byPage = new Map();
+      hits.forEach((hit, index) => {
+        if (!byPage.has(hit.page)) byPage.set(hit.page, []);
+        byPage.get(hit.page).push(index);
+      });
+      findState = { query, hits, byPage, index: -1 };
+      repaintFindLayers();
+      updateFindStatus();
+    }
+
+    function resetFind() {
+      findRun++;
+      findIndex = null;
+      findIndexLoad = null;
+      findBox.hidden = !wordLayer;
+      setFindHits('', []);
+    }
+
+    async function runFind(rawQuery) {
+      const query = normalizeFindText(rawQuery);
+      const run = ++findRun;
+      if (!query || !wordLayer) {
+        setFindHits(query, []);
+        return;
+      }
+      const start = performance.now();
+      findStatus.textContent = 'Searching…';
+      if (!findIndexLoad) findIndexLoad = loadFindIndex();
+      const index = await findIndexLoad;
+      if (run !== findRun) return;
+      findIndex = index;
+      const pages = candidatePages(query);
+      const shards = await Promise.all(pages.map(pageNumber =>
+        loadWordShard(pageNumber).catch(err => {
+          console.error(err);
+          return null;
+        })
+      ));
+      if (run !== findRun) return;
+
+      const hits = [];
+      shards.forEach((shard, i) => {
+        if (shard) hits.push(...findOnPage(shard, pages[i], query));
+      });
+      recordMeasure('find', start);
+      setFindHits(query, hits);
+      if (hits.length) goToFindHit(0);
+    }
+
+    function goToFindHit(index) {
+      const hits = findState.hits;
+      if (!hits.length) return;
+      findState.index = (index + hits.length) % hits.length;
+      repaintFindLayers();
+      updateFindStatus();
+
+      const hit = hits[findState.index];
+      const target = sectionAt(hit.page, hit.top);
+      if (target) highlightSection(target.node, target.chapter);
+      const position = { page: hit.page, top: hit.top };
+      if (!continuousToggle.checked && singlePageView && content.contains(singlePageView.frame)) {
+        singlePageView.goToPosition(position.page, position.top, target);
+      } else if (target) {
+        showHeading(target.node, target.chapter, position);
+      }
+    }
+
+    // Corpus mode: each document's headings JSON is fetched on first use
+    const CORPUS_HITS_PER_DOC = 10;
+    const docDataCache = new Map();  // corpus index -> Promise<headings data>
+
+    function fetchDocumentData(index) {
+      let promise = docDataCache.get(index);
+      if (!promise) {
+        promise = fetch(corpus[index].data).then(response => {
+          if (!response.ok) {
+            throw new Error(`Failed to load ${corpus[index].data}: ${response.status}`);
+          }
+          return response.json();
+        });
+        promise.catch(() => docDataCache.delete(index));
+        docDataCache.set(index, promise);
+      }
+      return promise;
+    }
+
+    function searchOtherDocuments(term) {
+      if (!corpus || !term) return [];
+      term = term.toLowerCase();
+      const groups = [];
+      corpus.forEach((doc, docIndex) => {
+        if (docIndex === currentDoc) return;
+        const hits = [];
+        for (const hit of doc.headings || []) {
+          if (hit[1].toLowerCase().includes(term)) {
+            hits.push(hit);
+            if (hits.length >= CORPUS_HITS_PER_DOC) break;
+          }
+        }
+        if (hits.length) {
+          groups.push({ docIndex, title: doc.title, hits });
+        }
+      });
+      return groups;
+    }
+
+    function refreshSidebar() {
+      const term = searchInput.value;
+      const filtered = filterNodesBySearch(term, allChapters);
+      selectedId = null;
+      renderSidebar(filtered, searchOtherDocuments(term));
+    }
+
+    async function openDocument(index, headingId) {
+      let data;
+      try {
+        data = await fetchDocumentData(index);
+      } catch (err) {
+        console.error(err);
+        return;
+      }
+
+      if (index !== currentDoc) {
+        closeContinuousView();
+        currentDoc = index;
+        docSelect.value = String(index);
+        loadDocumentData(data, corpus[index]);
+        lastShown = null;
+        prerenderedPage = null;
+        content.innerHTML = initialContentHtml;
+        refreshSidebar();
+        prewarmDocument();
+      }
+
+      if (headingId !== undefined && nodesById.has(headingId)) {
+        const target = sectionTargets.get(headingId) || { node: nodesById.get(headingId), chapter: nodesById.get(headingId) };
+        highlightSection(target.node, target.chapter);
+        showHeading(target.node, target.chapter);
+      }
+    }
+
+    // Initial render
+    if (corpus) {
+      corpus.forEach((doc, index) => {
+        const option = document.createElement('option');
+        option.value = String(index);
+        option.textContent = doc.title;
+        docSelect.appendChild(option);
+      });
+      docSelect.hidden = false;
+      docSelect.addEventListener('change', () => openDocument(Number(docSelect.value)));
+      if (corpus.length) {
+        openDocument(0);
+      }
+    } else {
+      loadDocumentData(pageData, null);
+      renderSidebar(allChapters);
+      prewarmDocument();
+    }
+
+    continuousToggle.addEventListener('change', () => {
+      if (continuousToggle.checked) {
+        if (lastShown) {
+          showHeading(lastShown.node, lastShown.chapter);
+        } else if (pdfSource) {
+          showHeadingContinuous(null, null);
+        }
+        return;
+      }
+      closeContinuousView();
+      if (lastShown) {
+        showHeading(lastShown.node, lastShown.chapter);
+      } else {
+        content.innerHTML = initialContentHtml;
+      }
+    });
+
+    // Search filter
+    searchInput.addEventListener('input', () => timed('search', refreshSidebar));
+
+    // Find in document: Enter searches, then steps through matches
+    findInput.addEventListener('keydown', event => {
+      if (event.key !== 'Enter') return;
+      event.preventDefault();
+      if (normalizeFindText(findInput.value) !== findState.query) {
+        runFind(findInput.value);
+      } else {
+        goToFindHit(findState.index + (event.shiftKey ? -1 : 1));
+      }
+    });
+    findInput.addEventListener('input', () => {
+      if (!findInput.value.trim()) runFind('');
+    });
+    document.getElementById('findPrev').addEventListener('click', () => goToFindHit(findState.index - 1));
+    document.getElementById('findNext').addEventListener('click', () => {
+      if (normalizeFindText(findInput.value) !== findState.query) {
+        runFind(findInput.value);
+      } else {
+        goToFindHit(findState.index + 1);
+      }
+    });
+
+    // Offline cache: the build writes a worker per page, scoped to the page
+    // so viewers sharing a folder do not replace each other's worker
+    if ('serviceWorker' in navigator && location.protocol !== 'file:') {
+      window.addEventListener('load', () => {
+        navigator.serviceWorker.register(SERVICE_WORKER_URL, { scope: SERVICE_WORKER_SCOPE }).catch(err => {
+          console.warn('Service worker registration failed', err);
+        });
+      });
+    }
+  </script>
+</body>
+</html>
+"""
+
+SERVICE_WORKER_TEMPLATE = """// Generated by build_headings_html.py - do not edit.
+// Serves the viewer, pdf.js and the PDF cache-first; find's word shards are
+// cached as they are fetched. CACHE_VERSION is derived
+// from the files' content hashes, so regenerating the handbook installs a new
+// worker and drops old caches; the page itself is also refreshed in the
+// background so the next open picks up a rebuild without waiting for that.
+const CACHE_PREFIX = __CACHE_PREFIX__;
+const CACHE_VERSION = '__VERSION__';
+const CACHE_NAME = CACHE_PREFIX + CACHE_VERSION;
+const PRECACHE_MANIFEST = __MANIFEST__;
+// Word-layer folders: one shard per page, so not worth installing up front
+const RUNTIME_PREFIXES = __RUNTIME_PREFIXES__;
+
+const precacheUrls = new Set(
+  Object.keys(PRECACHE_MANIFEST).map(url => new URL(url, self.location).href)
+);
+const runtimePrefixes = RUNTIME_PREFIXES.map(prefix => new URL(prefix, self.location).href);
+
+// Cache-first for runtime URLs; a failed fetch is not cached, so only that
+// shard is retried next time
+async function runtimeResponse(href) {
+  const cache = await caches.open(CACHE_NAME);
+  const cached = await cache.match(href);
+  if (cached) return cached;
+  const response = await fetch(href);
+  if (response.ok) await cache.put(href, response.clone());
+  return response;
+}
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(CACHE_NAME)
+      .then(cache => cache.addAll(Object.keys(PRECACHE_MANIFEST)))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(
+        keys
+          .filter(key => key.startsWith(CACHE_PREFIX) && key !== CACHE_NAME)
+          .map(key => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+// pdf.js fetches large PDFs in chunks; answer Range requests from the
+// cached full response instead of going to the network.
+async function rangeResponse(response, rangeHeader) {
+  const match = /^bytes=(\\d*)-(\\d*)$/.exec(rangeHeader.trim());
+  const body = await response.arrayBuffer();
+  const size = body.byteLength;
+  if (!match || (!match[1] && !match[2])) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${size}` } });
+  }
+  let start;
+  let end;
+  if (match[1]) {
+    start = Number(match[1]);
+    end = match[2] ? Math.min(Number(match[2]), size - 1) : size - 1;
+  } else {
+    start = Math.max(size - Number(match[2]), 0);
+    end = size - 1;
+  }
+  if (start > end || start >= size) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${size}` } });
+  }
+  return new Response(body.slice(start, end + 1), {
+    status: 206,
+    headers: {
+      'Content-Type': response.headers.get('Content-Type') || 'application/octet-stream',
+      'Content-Length': String(end - start + 1),
+      'Content-Range': `bytes ${start}-${end}/${size}`,
+      'Accept-Ranges': 'bytes',
+    },
+  });
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+  url.search = '';
+  url.hash = '';
+  if (!precacheUrls.has(url.href)) {
+    if (runtimePrefixes.some(prefix => url.href.startsWith(prefix))) {
+      event.respondWith(runtimeResponse(url.href));
+    }
+    return;
+  }
+
+  event.respondWith((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const rangeHeader = request.headers.get('Range');
+    const refresh = () => fetch(url.href).then(response => {
+      if (response.ok) {
+        return cache.put(url.href, response.clone()).then(() => response);
+      }
+      return response;
+    });
+
+    const cached = await cache.match(url.href);
+    if (!cached) {
+      const response = await refresh();
+      return rangeHeader && response.ok ? rangeResponse(response, rangeHeader) : response;
+    }
+
+    // Hashed assets (pdf.js, the PDF) never change within a cache version
+    if (request.mode === 'navigate') {
+      event.waitUntil(refresh().catch(() => {}));
+    }
+    return rangeHeader ? rangeResponse(cached, rangeHeader) : cached;
+  })());
+});
+"""
+
+VENDOR_FILES = ("vendor/pdfjs/pdf.min.js", "vendor/pdfjs/pdf.worker.min.js")
+IMG_SRC_RE = re.compile(r'<img src="([^"]*)"')  # as written by format_lines_as_html
+
+
+def file_digest(path):
+    """Short SHA-256 content hash of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def pdf_url(data):
+    """The PDF URL the viewer will load (mirrors `pdfSource` in the page)."""
+    if not isinstance(data, dict):
+        return ""
+    for key in ("pdf_path", "pdf", "pdf_filename", "pdfPath"):
+        if data.get(key):
+            return data[key]
+    return ""
+
+
+def service_worker_name(output_path):
+    """File name of the service worker generated for `output_path`."""
+    return f"{output_path.stem}.sw.js"
+
+
+def folder_digest(path):
+    """Short SHA-256 over the names and content hashes of a folder's files."""
+    digest = hashlib.sha256()
+    for child in sorted(path.iterdir()):
+        if child.is_file():
+            digest.update(f"{child.name}\0{file_digest(child)}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_service_worker(output_path, data, extra_urls=(), word_layers=()):
+    """
+    Write the HTML's service worker next to it and return its cache version.
+
+    The precache manifest maps each URL (relative to the HTML) to the hash
+    of its content. Word layers (`detect_headings.py --words`) are not
+    precached: find fetches only the shards it needs, and the worker keeps
+    whatever it fetched under those URL prefixes. The cache version is a
+    hash of the manifest plus the word-layer folders, so a rebuild after
+    any of them changed drops the old cache.
+    """
+    base_dir = output_path.parent
+    urls = [output_path.name, *VENDOR_FILES, *extra_urls]
+    pdf = pdf_url(data)
+    if pdf:
+        urls.append(pdf)
+    if isinstance(data, dict):
+        urls.extend(unescape(src) for src in section_image_srcs(data.get("headings", [])))
+    urls = list(dict.fromkeys(url for url in urls if url))
+
+    word_layers = list(word_layers)
+    if isinstance(data, dict) and data.get("word_layer"):
+        word_layers.append(data["word_layer"].get("url", ""))
+    runtime = {}
+    for url in dict.fromkeys(url for url in word_layers if url):
+        if (base_dir / url).is_dir():
+            runtime[url.rstrip("/") + "/"] = folder_digest(base_dir / url)
+
+    manifest = {}
+    for url in urls:
+        path = base_dir / url
+        if not path.is_file():
+            print(f"⚠️  {url} not found next to {output_path.name}; leaving it out of the offline cache")
+            continue
+        manifest[url] = file_digest(path)
+
+    version = hashlib.sha256(
+        json.dumps([manifest, runtime], sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+
+    worker = (
+        SERVICE_WORKER_TEMPLATE
+        .replace("__CACHE_PREFIX__", json.dumps(f"handbook-viewer-{output_path.stem}-"))
+        .replace("__VERSION__", version)
+        .replace("__MANIFEST__", json.dumps(manifest, indent=2))
+        .replace("__RUNTIME_PREFIXES__", json.dumps(sorted(runtime)))
+    )
+    (base_dir / service_worker_name(output_path)).write_text(worker, encoding="utf-8")
+    return version
+
+
+def iter_headings(nodes):
+    """Yield every heading in the tree in reading (pre-)order."""
+    for node in nodes:
+        yield node
+        yield from iter_headings(node.get("children") or [])
+
+
+def build_page_sections(tree, page_count=None):
+    """
+    Precompute the page -> section interval table used by the viewer.
+
+    Entry P - 1 is the id of the first heading that starts on page P, or of
+    the section carried over from an earlier page when none starts there.
+    Pages before the first heading map to None. Without `page_count` the
+    table stops at the last heading's page and the viewer clamps later pages
+    to its last entry.
+    """
+    headings = sorted(iter_headings(tree), key=lambda h: (h["page"], h["top"]))
+    if not headings:
+        return []
+
+    last_page = max(headings[-1]["page"], page_count or 0)
+    table = [None] * last_page
+    current = None
+    pos = 0
+    for page in range(1, last_page + 1):
+        first_on_page = None
+        while pos < len(headings) and headings[pos]["page"] == page:
+            if first_on_page is None:
+                first_on_page = headings[pos]["id"]
+            current = headings[pos]["id"]
+            pos += 1
+        table[page - 1] = first_on_page if first_on_page is not None else current
+    return table
+
+
+def relative_url(path, base_dir):
+    """URL of `path` relative to the directory the HTML is served from."""
+    return Path(os.path.relpath(path, base_dir)).as_posix()
+
+
+def rebase_url(url, json_dir, base_dir):
+    """
+    Rewrite a URL from headings.json (relative to the JSON's folder) to be
+    relative to the HTML's folder; URLs that are not local files are kept.
+    """
+    if url and (json_dir / url).exists():
+        return relative_url(json_dir / url, base_dir)
+    return url
+
+
+def section_image_srcs(tree):
+    """`src` attributes (still HTML-escaped) of every image in the section bodies."""
+    srcs = {}
+    for node in iter_headings(tree):
+        for src in IMG_SRC_RE.findall(node.get("content_html") or ""):
+            srcs[src] = None
+    return list(srcs)
+
+
+def build_corpus_manifest(json_paths, output_path):
+    """
+    Describe several headings.json files for the library viewer.
+
+    Only what the sidebar needs before a document is opened is embedded:
+    its title, heading ids/texts for cross-document search, its page ->
+    section table, and URLs of its JSON, PDF, word layer and images
+    relative to the HTML. Section bodies are fetched with the JSON, so
+    `images` maps each `<img src>` in them (as written, HTML-escaped) to the
+    rebased URL the viewer substitutes when showing a section.
+    """
+    base_dir = output_path.parent
+    documents = []
+    for json_path in json_paths:
+        data = json.loads(json_path.read_text(encoding="utf-8"))
+        tree = data if isinstance(data, list) else data.get("headings", [])
+        page_count = 0 if isinstance(data, list) else len(data.get("page_sizes") or [])
+
+        pdf = rebase_url(pdf_url(data), json_path.parent, base_dir)
+        words = "" if isinstance(data, list) else (data.get("word_layer") or {}).get("url", "")
+        words = rebase_url(words, json_path.parent, base_dir)
+        images = {
+            src: escape(rebase_url(unescape(src), json_path.parent, base_dir))
+            for src in section_image_srcs(tree)
+        }
+
+        documents.append(
+            {
+                "title": Path(pdf).stem if pdf else json_path.stem,
+                "data": relative_url(json_path, base_dir),
+                "pdf": pdf,
+                "words": words,
+                "images": images,
+                "page_sections": build_page_sections(tree, page_count=page_count),
+                "headings": [[h["id"], h["text"]] for h in iter_headings(tree)],
+            }
+        )
+    return {"corpus": documents}
+
+
+def write_html(output_path, data, telemetry_endpoint=""):
+    serialized = json.dumps(data).replace("</", "<\\/")
+    # Telemetry groups measures per build; any change to the data is a new one
+    build_id = hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:12]
+    html = (
+        HTML_TEMPLATE
+        .replace("__TELEMETRY_ENDPOINT__", json.dumps(telemetry_endpoint or ""))
+        .replace("__BUILD_ID__", json.dumps(build_id))
+        .replace("__SERVICE_WORKER_URL__", json.dumps(service_worker_name(output_path)))
+        .replace("__SERVICE_WORKER_SCOPE__", json.dumps(f"./{output_path.name}"))
+        .replace("__JSON_DATA__", serialized)
+    )
+    output_path.write_text(html, encoding="utf-8")
+    print(f"✅ Wrote {output_path}")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Generate the HTML navigator for headings.json (or a library of them)."
+    )
+    parser.add_argument("json", nargs="+", help="headings.json file(s) from detect_headings.py --json")
+    parser.add_argument(
+        "--corpus",
+        metavar="HTML",
+        default=None,
+        help="Build one multi-document viewer at HTML covering every given JSON file",
+    )
+    parser.add_argument(
+        "--telemetry-endpoint",
+        metavar="URL",
+        default="",
+        help="Send viewer timings to this URL with sendBeacon (see telemetry_collector.py)",
+    )
+
+    args = parser.parse_args(argv)
+    json_paths = [Path(p) for p in args.json]
+
+    if args.corpus:
+        output_path = Path(args.corpus)
+        manifest = build_corpus_manifest(json_paths, output_path)
+        write_html(output_path, manifest, telemetry_endpoint=args.telemetry_endpoint)
+        print(f"   {len(manifest['corpus'])} documents; serve the folder over HTTP to browse them.")
+        # pdf_url() finds nothing in a corpus manifest; every document's
+        # JSON, PDF and images are precached instead
+        extra_urls = []
+        for doc in manifest["corpus"]:
+            extra_urls.extend((doc["data"], doc["pdf"]))
+            extra_urls.extend(unescape(url) for url in doc["images"].values())
+        version = build_service_worker(
+            output_path,
+            manifest,
+            extra_urls=extra_urls,
+            word_layers=[doc["words"] for doc in manifest["corpus"]],
+        )
+        worker_path = output_path.parent / service_worker_name(output_path)
+        print(f"✅ Wrote {worker_path} (offline cache version {version})")
+        return
+
+    if len(json_paths) != 1:
+        parser.error("pass exactly one headings.json, or use --corpus to combine several")
+
+    json_path = json_paths[0]
+    data = json.loads(json_path.read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data["page_sections"] = build_page_sections(
+            data.get("headings", []), page_count=len(data.get("page_sizes") or [])
+        )
+
+    output_path = json_path.with_suffix(".html")
+    write_html(output_path, data, telemetry_endpoint=args.telemetry_endpoint)
+    print("   Open this file in your browser to click through the headings.")
+
+    version = build_service_worker(output_path, data)
+    worker_path = output_path.parent / service_worker_name(output_path)
+    print(f"✅ Wrote {worker_path} (offline cache version {version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Kept so `python3 handbook_index.py ...` and `import handbook_index` keep working; see handbook.index."""
+
+from handbook.index import *  # noqa: F401,F403
+from handbook.index import main
+
+if __name__ == "__main__":
+    main()
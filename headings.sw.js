@@ -0,0 +1,122 @@
+// Generated by build_headings_html.py - do not edit.
+// Serves the viewer, pdf.js and the PDF cache-first; find's word shards are
+// cached as they are fetched. CACHE_VERSION is derived
+// from the files' content hashes, so regenerating the handbook installs a new
+// worker and drops old caches; the page itself is also refreshed in the
+// background so the next open picks up a rebuild without waiting for that.
+const CACHE_PREFIX = "handbook-viewer-headings-";
+const CACHE_VERSION = '4b59f9d2c4f4';
+const CACHE_NAME = CACHE_PREFIX + CACHE_VERSION;
+const PRECACHE_MANIFEST = {
+  "headings.html": "89fd164dab002ca3",
+  "vendor/pdfjs/pdf.min.js": "1fc294eefda602e5",
+  "vendor/pdfjs/pdf.worker.min.js": "99732130603cd498",
+  "Pain Management Handbook 2019. palliative (PDF).pdf": "91fbb36bceb1b1ed"
+};
+// Word-layer folders: one shard per page, so not worth installing up front
+const RUNTIME_PREFIXES = [];
+
+const precacheUrls = new Set(
+  Object.keys(PRECACHE_MANIFEST).map(url => new URL(url, self.location).href)
+);
+const runtimePrefixes = RUNTIME_PREFIXES.map(prefix => new URL(prefix, self.location).href);
+
+// Cache-first for runtime URLs; a failed fetch is not cached, so only that
+// shard is retried next time
+async function runtimeResponse(href) {
+  const cache = await caches.open(CACHE_NAME);
+  const cached = await cache.match(href);
+  if (cached) return cached;
+  const response = await fetch(href);
+  if (response.ok) await cache.put(href, response.clone());
+  return response;
+}
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(CACHE_NAME)
+      .then(cache => cache.addAll(Object.keys(PRECACHE_MANIFEST)))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(
+        keys
+          .filter(key => key.startsWith(CACHE_PREFIX) && key !== CACHE_NAME)
+          .map(key => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+// pdf.js fetches large PDFs in chunks; answer Range requests from the
+// cached full response instead of going to the network.
+async function rangeResponse(response, rangeHeader) {
+  const match = /^bytes=(\d*)-(\d*)$/.exec(rangeHeader.trim());
+  const body = await response.arrayBuffer();
+  const size = body.byteLength;
+  if (!match || (!match[1] && !match[2])) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${size}` } });
+  }
+  let start;
+  let end;
+  if (match[1]) {
+    start = Number(match[1]);
+    end = match[2] ? Math.min(Number(match[2]), size - 1) : size - 1;
+  } else {
+    start = Math.max(size - Number(match[2]), 0);
+    end = size - 1;
+  }
+  if (start > end || start >= size) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${size}` } });
+  }
+  return new Response(body.slice(start, end + 1), {
+    status: 206,
+    headers: {
+      'Content-Type': response.headers.get('Content-Type') || 'application/octet-stream',
+      'Content-Length': String(end - start + 1),
+      'Content-Range': `bytes ${start}-${end}/${size}`,
+      'Accept-Ranges': 'bytes',
+    },
+  });
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+  url.search = '';
+  url.hash = '';
+  if (!precacheUrls.has(url.href)) {
+    if (runtimePrefixes.some(prefix => url.href.startsWith(prefix))) {
+      event.respondWith(runtimeResponse(url.href));
+    }
+    return;
+  }
+
+  event.respondWith((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const rangeHeader = request.headers.get('Range');
+    const refresh = () => fetch(url.href).then(response => {
+      if (response.ok) {
+        return cache.put(url.href, response.clone()).then(() => response);
+      }
+      return response;
+    });
+
+    const cached = await cache.match(url.href);
+    if (!cached) {
+      const response = await refresh();
+      return rangeHeader && response.ok ? rangeResponse(response, rangeHeader) : response;
+    }
+
+    // Hashed assets (pdf.js, the PDF) never change within a cache version
+    if (request.mode === 'navigate') {
+      event.waitUntil(refresh().catch(() => {}));
+    }
+    return rangeHeader ? rangeResponse(cached, rangeHeader) : cached;
+  })());
+});
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Kept so `python3 search_index.py ...` and `import search_index` keep working; see handbook.search."""
+
+from handbook.search import *  # noqa: F401,F403
+from handbook.search import main
+
+if __name__ == "__main__":
+    main()
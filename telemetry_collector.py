@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Kept so `python3 telemetry_collector.py ...` and `import telemetry_collector` keep working; see handbook.telemetry."""
+
+from handbook.telemetry import *  # noqa: F401,F403
+from handbook.telemetry import main
+
+if __name__ == "__main__":
+    main()